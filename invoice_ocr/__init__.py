@@ -1,7 +1,9 @@
 from invoice_ocr.converter import convert
 from invoice_ocr.api import (
     OCRConfig,
+    AsyncDocumentIntelligenceEngine,
     DocumentIntelligenceEngine,
+    iter_documents,
     process_document,
     process_documents,
 )
@@ -9,7 +11,9 @@ from invoice_ocr.api import (
 __all__ = [
     "OCRConfig",
     "DocumentIntelligenceEngine",
+    "AsyncDocumentIntelligenceEngine",
     "process_document",
     "process_documents",
+    "iter_documents",
     "convert",
 ]
@@ -1,10 +1,16 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
 from pathlib import Path
-from typing import Iterable, Union
+from typing import Iterable, Iterator, Union
 
-from invoice_ocr.pipeline import run_pipeline
+from invoice_ocr.pipeline import run_pipeline, run_pipeline_many
+from invoice_ocr.preprocess.deskew import DESKEW_METHODS
+from invoice_ocr.schema.universal import SCHEMA_VERSION
+from invoice_ocr.universal_engine import ENGINE_VERSION, output_sections
+from invoice_ocr.utils.disk_cache import cache_key, file_sha256, open_cache
 
 PathLike = Union[str, Path]
 
@@ -12,17 +18,291 @@ PathLike = Union[str, Path]
 @dataclass(frozen=True)
 class OCRConfig:
     enable_deskew: bool = True
+    # Skew estimator: "min_area_rect" (full-resolution foreground pixels),
+    # "projection" (projection profiles of a downscaled page, much cheaper) or
+    # "detector" (slope of the PaddleOCR text boxes; no separate pass).
+    deskew_method: str = "min_area_rect"
+    # Skip the estimator on pages a thumbnail check finds clearly straight.
+    deskew_precheck: bool = False
+    # Pages OCR'd concurrently, each worker process holding its own PaddleOCR.
+    ocr_workers: int = 1
+    # Debug only: write rendered pages as PNGs instead of streaming arrays.
+    save_page_images: bool = False
+    page_image_dir: str | None = None
+    # Pages rendered per Poppler call; bounds peak memory on long PDFs.
+    page_window: int = 4
+    # Read born-digital pages from the PDF text layer; OCR only the rest.
+    use_text_layer: bool = False
+    # Optional on-disk result cache keyed on input bytes + config + versions.
+    cache_dir: str | None = None
+    cache_max_bytes: int = 1 << 30
+    # Optional on-disk OCR block cache (per document and per rendered page),
+    # so table/validation/schema changes can be re-run without re-OCR.
+    ocr_cache_dir: str | None = None
+    ocr_cache_max_bytes: int = 4 << 30
+    # > 0 batches text recognition across pages (and documents in
+    # process_many), feeding the recognizer this many crops per call.
+    rec_batch_size: int = 0
+    # Render pages at low_dpi first and re-render at 300 DPI only pages whose
+    # text is too small or uncertain; bboxes stay in 300-DPI coordinates.
+    adaptive_dpi: bool = False
+    low_dpi: int = 150
+    # Documents processed concurrently by iter_process / iter_documents,
+    # each worker process holding warm OCR models.
+    document_workers: int = 1
+    # Documents submitted ahead of the consumer; 0 means 2 x document_workers.
+    max_in_flight: int = 0
+    # Include the pre-2.0 universal invoice as meta.legacy_universal.
+    legacy_universal: bool = True
+    # Output sections to build: "minimal" (normalized + risk), "normalized",
+    # "full" or "debug" (full + per-stage meta.timings_ms).
+    output_profile: str = "full"
+    # Optional dotted paths to keep, e.g. ("normalized.totals", "risk");
+    # stages behind sections not listed are skipped. meta is always kept.
+    output_fields: tuple[str, ...] | None = None
+
+    def __post_init__(self):
+        # Reject bad settings here rather than after the first document has
+        # been rendered and OCR'd.
+        if self.deskew_method not in DESKEW_METHODS:
+            raise ValueError(f"Unknown deskew method: {self.deskew_method!r}")
+        output_sections(self.output_profile, self.output_fields)
+
+
+# Settings that change how a document is processed but not the result.
+_CACHE_NEUTRAL_FIELDS = {
+    "ocr_workers",
+    "save_page_images",
+    "page_image_dir",
+    "page_window",
+    "cache_dir",
+    "cache_max_bytes",
+    "ocr_cache_dir",
+    "ocr_cache_max_bytes",
+    "document_workers",
+    "max_in_flight",
+}
 
 
 class DocumentIntelligenceEngine:
     def __init__(self, config: OCRConfig | None = None):
         self.config = config or OCRConfig()
+        self.cache = None
+        if self.config.cache_dir:
+            self.cache = open_cache(
+                self.config.cache_dir,
+                max_bytes=self.config.cache_max_bytes,
+            )
+        self.ocr_cache = None
+        if self.config.ocr_cache_dir:
+            self.ocr_cache = open_cache(
+                self.config.ocr_cache_dir,
+                max_bytes=self.config.ocr_cache_max_bytes,
+            )
+
+    def _cache_key(self, input_path: Path) -> str:
+        settings = {
+            k: v for k, v in asdict(self.config).items()
+            if k not in _CACHE_NEUTRAL_FIELDS
+        }
+        return cache_key(file_sha256(input_path), settings, ENGINE_VERSION, SCHEMA_VERSION)
+
+    def _lookup(self, input_path: Path):
+        """
+        Returns `(key, cached_result)`; both None when caching is off.
+        """
+        if self.cache is None:
+            return None, None
+        key = self._cache_key(input_path)
+        return key, self.cache.get(key)
+
+    def _finish(self, key, result: dict, hit: bool) -> dict:
+        if self.cache is None:
+            return result
+        if not hit:
+            self.cache.put(key, result)
+        result["meta"]["cache"] = {"hit": hit, **self.cache.stats()}
+        return result
+
+    def _pipeline_options(self) -> dict:
+        return {
+            "enable_deskew": self.config.enable_deskew,
+            "ocr_workers": self.config.ocr_workers,
+            "save_page_images": self.config.save_page_images,
+            "page_image_dir": self.config.page_image_dir,
+            "page_window": self.config.page_window,
+            "use_text_layer": self.config.use_text_layer,
+            "ocr_cache": self.ocr_cache,
+            "rec_batch_size": self.config.rec_batch_size,
+            "low_dpi": self.config.low_dpi if self.config.adaptive_dpi else None,
+            "deskew_method": self.config.deskew_method,
+            "deskew_precheck": self.config.deskew_precheck,
+            "legacy_universal": self.config.legacy_universal,
+            "output_profile": self.config.output_profile,
+            "fields": self.config.output_fields,
+        }
 
     def process(self, input_path: PathLike) -> dict:
-        return run_pipeline(Path(input_path), enable_deskew=self.config.enable_deskew)
+        input_path = Path(input_path)
+        key, result = self._lookup(input_path)
+        if result is not None:
+            return self._finish(key, result, hit=True)
+
+        result = run_pipeline(input_path, **self._pipeline_options())
+        return self._finish(key, result, hit=False)
 
     def process_many(self, input_paths: Iterable[PathLike]) -> list[dict]:
-        return [self.process(path) for path in input_paths]
+        input_paths = [Path(p) for p in input_paths]
+        if self.config.rec_batch_size <= 0:
+            return [self.process(path) for path in input_paths]
+
+        # Cache misses go through one shared page stream so their pages
+        # fill recognition batches together.
+        results = [None] * len(input_paths)
+        keys = [None] * len(input_paths)
+        misses = []
+        for i, path in enumerate(input_paths):
+            keys[i], cached = self._lookup(path)
+            if cached is not None:
+                results[i] = self._finish(keys[i], cached, hit=True)
+            else:
+                misses.append(i)
+
+        outputs = run_pipeline_many(
+            [input_paths[i] for i in misses],
+            **self._pipeline_options(),
+        )
+        for i, result in zip(misses, outputs):
+            results[i] = self._finish(keys[i], result, hit=False)
+        return results
+
+    def iter_process(
+        self,
+        input_paths: Iterable[PathLike],
+        ordered: bool = True,
+    ) -> Iterator[tuple[Path, dict]]:
+        """
+        Lazily process documents, yielding `(input_path, result)` pairs.
+
+        With `document_workers > 1` documents run across warm worker
+        processes, at most `max_in_flight` at a time. Results come in input
+        order when `ordered`, otherwise as they finish. A document that
+        fails yields an error record (`{"input", "error": {"type",
+        "message"}}`) instead of aborting the batch.
+        """
+        if self.config.document_workers > 1:
+            from invoice_ocr.document_pool import iter_documents_parallel
+
+            yield from iter_documents_parallel(
+                input_paths,
+                self.config,
+                ordered=ordered,
+                max_in_flight=self.config.max_in_flight,
+            )
+            return
+
+        from invoice_ocr.document_pool import error_record
+
+        for input_path in input_paths:
+            input_path = Path(input_path)
+            try:
+                yield input_path, self.process(input_path)
+            except Exception as exc:
+                yield input_path, error_record(input_path, exc)
+
+
+class AsyncDocumentIntelligenceEngine:
+    """
+    asyncio front end to `DocumentIntelligenceEngine`.
+
+    Rendering and OCR never run on the event loop. With `document_workers > 1`
+    documents go to the shared pool of warm worker processes; otherwise to a
+    single background thread owned by this engine, since one PaddleOCR
+    instance is not safe to share between threads. At most `max_in_flight`
+    documents (default `2 x document_workers`) are submitted at a time; the
+    rest wait on a semaphore without holding an executor slot.
+
+    Cancelling a call, or hitting its `timeout`, drops a document that has
+    not started yet. One that is already running finishes in the background
+    and its result is discarded.
+    """
+
+    def __init__(self, config: OCRConfig | None = None):
+        self.config = config or OCRConfig()
+        self.engine = DocumentIntelligenceEngine(config=self.config)
+        workers = max(1, self.config.document_workers)
+        self._slots = asyncio.Semaphore(self.config.max_in_flight or 2 * workers)
+        self._thread = None
+
+    def _submit(self, input_path: Path):
+        if self.config.document_workers > 1:
+            from invoice_ocr.document_pool import process_in_worker, submit_document
+
+            return submit_document(self.config, process_in_worker, input_path)
+
+        if self._thread is None:
+            self._thread = ThreadPoolExecutor(max_workers=1, thread_name_prefix="invoice-ocr")
+        return self._thread.submit(self.engine.process, input_path)
+
+    async def process(self, input_path: PathLike, timeout: float | None = None) -> dict:
+        """
+        Raises `asyncio.TimeoutError` when the document takes longer than
+        `timeout` seconds, counting time spent waiting for a free slot.
+        """
+        input_path = Path(input_path)
+
+        async def run():
+            async with self._slots:
+                return await asyncio.wrap_future(self._submit(input_path))
+
+        return await asyncio.wait_for(run(), timeout)
+
+    async def process_many(
+        self,
+        input_paths: Iterable[PathLike],
+        timeout: float | None = None,
+        return_errors: bool = False,
+    ) -> list[dict]:
+        """
+        Processes documents concurrently, returning results in input order.
+
+        `timeout` applies per document. With `return_errors`, a failed
+        document becomes an error record (`{"input", "error": {"type",
+        "message"}}`) instead of cancelling the rest and raising.
+        """
+        from invoice_ocr.document_pool import error_record
+
+        input_paths = [Path(p) for p in input_paths]
+        tasks = [
+            asyncio.ensure_future(self.process(path, timeout=timeout))
+            for path in input_paths
+        ]
+        try:
+            results = await asyncio.gather(*tasks, return_exceptions=return_errors)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+
+        return [
+            error_record(path, result) if isinstance(result, BaseException) else result
+            for path, result in zip(input_paths, results)
+        ]
+
+    async def aclose(self) -> None:
+        """
+        Waits for this engine's background thread; shared worker pools stay
+        up for other engines (see `shutdown_document_pools`).
+        """
+        if self._thread is not None:
+            thread, self._thread = self._thread, None
+            await asyncio.get_running_loop().run_in_executor(None, thread.shutdown)
+
+    async def __aenter__(self) -> "AsyncDocumentIntelligenceEngine":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
 
 
 def process_document(input_path: PathLike, config: OCRConfig | None = None) -> dict:
@@ -36,3 +316,12 @@ def process_documents(
 ) -> list[dict]:
     engine = DocumentIntelligenceEngine(config=config)
     return engine.process_many(input_paths)
+
+
+def iter_documents(
+    input_paths: Iterable[PathLike],
+    config: OCRConfig | None = None,
+    ordered: bool = True,
+) -> Iterator[tuple[Path, dict]]:
+    engine = DocumentIntelligenceEngine(config=config)
+    return engine.iter_process(input_paths, ordered=ordered)
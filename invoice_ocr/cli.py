@@ -1,15 +1,244 @@
 ﻿import argparse
+import glob
+import hashlib
 import json
+import sys
+import time
+from pathlib import Path
+
 from invoice_ocr import convert
 from invoice_ocr.utils.json_encoder import DecimalEncoder
 
+# Only PDFs can be processed; directory scans and globs skip everything else.
+INPUT_SUFFIXES = {".pdf"}
+
+
+def _glob_root(pattern):
+    root = []
+    for part in Path(pattern).parts:
+        if glob.has_magic(part):
+            break
+        root.append(part)
+    return Path(*root) if root else Path(".")
+
+
+def _relative_to(path, root):
+    try:
+        return path.relative_to(root)
+    except ValueError:
+        return Path(path.name)
+
+
+def expand_inputs(inputs, list_file=None):
+    """
+    Resolves files, directories (searched recursively) and glob patterns to
+    a de-duplicated list of input files, in the order given. Directories and
+    globs yield only `INPUT_SUFFIXES` files; plain file arguments are kept.
+
+    Returns:
+        list[tuple[Path, Path]]: `(input_path, relative_path)` pairs, where
+        `relative_path` is the input relative to the directory or glob root
+        it was found under (just the file name for plain file arguments)
+    """
+    patterns = list(inputs)
+    if list_file:
+        with open(list_file, encoding="utf-8") as f:
+            patterns.extend(line.strip() for line in f if line.strip())
+
+    seen = set()
+    paths = []
+    for pattern in patterns:
+        if glob.has_magic(pattern):
+            root = _glob_root(pattern)
+            matches = [
+                Path(p) for p in sorted(glob.glob(pattern, recursive=True))
+                if Path(p).is_file() and Path(p).suffix.lower() in INPUT_SUFFIXES
+            ]
+        elif Path(pattern).is_dir():
+            root = Path(pattern)
+            matches = sorted(
+                p for p in Path(pattern).rglob("*")
+                if p.is_file() and p.suffix.lower() in INPUT_SUFFIXES
+            )
+        else:
+            root = Path(pattern).parent
+            matches = [Path(pattern)]
+
+        for path in matches:
+            if path not in seen:
+                seen.add(path)
+                paths.append((path, _relative_to(path, root)))
+    return paths
+
+
+def output_files(entries, out_dir):
+    """
+    Maps each input to its JSON file under `out_dir`, mirroring its path
+    relative to the input root. Inputs from different roots that would
+    still share a file get a short hash of their full path appended.
+    """
+    names = [rel.with_suffix(".json") for _, rel in entries]
+    counts = {}
+    for name in names:
+        counts[name] = counts.get(name, 0) + 1
+
+    files = {}
+    for (path, _), name in zip(entries, names):
+        if counts[name] > 1:
+            digest = hashlib.sha1(str(path.resolve()).encode("utf-8")).hexdigest()[:8]
+            name = name.with_name(f"{name.stem}-{digest}.json")
+        files[path] = Path(out_dir) / name
+    return files
+
+
+def _done_inputs(jsonl_path):
+    """
+    Inputs that already have a successful record in a JSONL output.
+    """
+    done = set()
+    try:
+        with open(jsonl_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if "error" not in record and "input" in record:
+                    done.add(record["input"])
+    except FileNotFoundError:
+        pass
+    return done
+
+
+def run_batch(args):
+    from invoice_ocr.api import OCRConfig, iter_documents
+
+    entries = expand_inputs(args.input, list_file=args.list)
+    paths = [path for path, _ in entries]
+    out_files = output_files(entries, args.out_dir) if args.out_dir else {}
+    skipped = 0
+    if args.resume:
+        if args.out_dir:
+            pending = [p for p in paths if not out_files[p].exists()]
+        else:
+            done = _done_inputs(args.jsonl) if args.jsonl else set()
+            pending = [p for p in paths if str(p) not in done]
+        skipped = len(paths) - len(pending)
+        paths = pending
+
+    config = OCRConfig(
+        enable_deskew=not args.disable_deskew,
+        document_workers=args.workers,
+    )
+
+    if args.out_dir:
+        Path(args.out_dir).mkdir(parents=True, exist_ok=True)
+        sink = None
+    elif args.jsonl:
+        sink = open(args.jsonl, "a" if args.resume else "w", encoding="utf-8")
+    else:
+        sink = sys.stdout
+
+    start = time.perf_counter()
+    processed = 0
+    errors = 0
+    try:
+        for path, result in iter_documents(paths, config=config, ordered=False):
+            processed += 1
+            if "error" in result:
+                errors += 1
+                print(f"error: {path}: {result['error']['message']}", file=sys.stderr)
+
+            if args.out_dir:
+                if "error" in result:
+                    continue
+                out_file = out_files[path]
+                out_file.parent.mkdir(parents=True, exist_ok=True)
+                with open(out_file, "w") as f:
+                    json.dump(result, f, indent=2, cls=DecimalEncoder)
+            else:
+                record = {"input": str(path), **result}
+                sink.write(json.dumps(record, cls=DecimalEncoder) + "\n")
+                sink.flush()
+    finally:
+        if sink is not None and sink is not sys.stdout:
+            sink.close()
+
+    elapsed = time.perf_counter() - start
+    rate = processed / elapsed if elapsed else 0.0
+    print(
+        f"processed {processed} documents ({errors} errors, {skipped} skipped) "
+        f"in {elapsed:.1f}s, {rate:.2f} docs/s",
+        file=sys.stderr,
+    )
+    return 1 if errors else 0
+
+
+def serve_main(argv):
+    parser = argparse.ArgumentParser(
+        prog="invoice-ocr serve",
+        description="Serve the OCR engine over HTTP with models loaded once",
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Documents processed concurrently, each in a warm worker process.",
+    )
+    parser.add_argument(
+        "--disable-deskew",
+        action="store_true",
+        help="Disable pre-OCR deskew correction.",
+    )
+
+    args = parser.parse_args(argv)
+
+    from invoice_ocr.api import OCRConfig
+    from invoice_ocr.server import serve
+
+    config = OCRConfig(
+        enable_deskew=not args.disable_deskew,
+        document_workers=args.workers,
+    )
+    serve(host=args.host, port=args.port, config=config)
+
 
 def main():
+    if sys.argv[1:2] == ["serve"]:
+        serve_main(sys.argv[2:])
+        return
+
     parser = argparse.ArgumentParser(
         description="PDF/Image to JSON Invoice OCR Engine"
     )
-    parser.add_argument("input", help="PDF or image file")
-    parser.add_argument("-o", "--out", help="Output JSON file")
+    parser.add_argument(
+        "input",
+        nargs="*",
+        help="PDF or image files, directories or glob patterns",
+    )
+    parser.add_argument("-o", "--out", help="Output JSON file (single input)")
+    parser.add_argument("--list", help="File listing one input path per line")
+    parser.add_argument(
+        "--jsonl",
+        help="Write one JSON record per input to this file (default: stdout in batch mode)",
+    )
+    parser.add_argument(
+        "--out-dir",
+        help="Write one .json per input into this directory, mirroring input subdirectories",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Documents processed concurrently, each in a warm worker process.",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Skip inputs that already have output in --jsonl / --out-dir.",
+    )
     parser.add_argument(
         "--disable-deskew",
         action="store_true",
@@ -17,7 +246,25 @@ def main():
     )
 
     args = parser.parse_args()
+    if not args.input and not args.list:
+        parser.error("no input given")
+    if args.resume and not (args.jsonl or args.out_dir):
+        parser.error("--resume needs --jsonl or --out-dir to find finished inputs")
+
+    single = (
+        len(args.input) == 1
+        and not args.list
+        and not args.jsonl
+        and not args.out_dir
+        and not glob.has_magic(args.input[0])
+        and not Path(args.input[0]).is_dir()
+    )
+    if not single:
+        if args.out:
+            parser.error("-o/--out takes a single input; use --jsonl or --out-dir for batches")
+        sys.exit(run_batch(args))
 
+    args.input = args.input[0]
     result = convert(args.input, enable_deskew=not args.disable_deskew)
 
     if args.out:
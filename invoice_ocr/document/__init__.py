@@ -0,0 +1,5 @@
+from invoice_ocr.document.block import Block, as_blocks
+from invoice_ocr.document.block_index import BlockIndex
+from invoice_ocr.document.corpus import TextCorpus
+
+__all__ = ["Block", "BlockIndex", "TextCorpus", "as_blocks"]
@@ -0,0 +1,57 @@
+import re
+
+_SPACE_RE = re.compile(r"\s+")
+
+
+def normalize_space(text):
+    """
+    Trims and collapses whitespace; None becomes "".
+    """
+    return _SPACE_RE.sub(" ", (text or "").strip())
+
+
+def normalize_for_match(value):
+    """
+    Lower-cased, whitespace-collapsed text without "," and "$", used to
+    match extracted values back to OCR blocks.
+    """
+    if value is None:
+        return ""
+    text = _SPACE_RE.sub(" ", str(value).strip()).lower()
+    return text.replace(",", "").replace("$", "")
+
+
+class Block(dict):
+    """
+    OCR block with its geometry and text forms computed once.
+
+    Still the `{"text", "confidence", "bbox", "page"}` dict every stage
+    reads, so existing code and the JSON output are unaffected; hot paths
+    use the attributes instead of re-deriving them from `bbox` and `text`.
+    Blocks are never mutated after OCR, so the attributes cannot go stale.
+    """
+
+    __slots__ = ("cx", "cy", "ymax", "text_lower", "norm", "norm_lower", "match_text")
+
+    def __init__(self, data):
+        super().__init__(data)
+        bbox = self["bbox"]
+        # Same formulas as table.geometry.center_x / center_y.
+        self.cx = (bbox[0][0] + bbox[1][0]) / 2
+        self.cy = (bbox[0][1] + bbox[2][1]) / 2
+        self.ymax = max(pt[1] for pt in bbox)
+
+        text = self.get("text")
+        self.text_lower = text.lower() if isinstance(text, str) else ""
+        self.norm = normalize_space(text)
+        self.norm_lower = self.norm.lower()
+        self.match_text = normalize_for_match(text)
+
+
+def as_blocks(blocks):
+    """
+    Returns `blocks` as a list of `Block`; the same list when it already is.
+    """
+    if isinstance(blocks, list) and all(type(b) is Block for b in blocks):
+        return blocks
+    return [b if isinstance(b, Block) else Block(b) for b in blocks]
@@ -0,0 +1,99 @@
+from bisect import bisect_left, bisect_right
+
+from invoice_ocr.document.block import as_blocks
+from invoice_ocr.document.corpus import TextCorpus
+
+# Band edges are widened by this much so that callers re-checking their own
+# `abs(by - ly) <= tol` style predicates never lose a block to float rounding.
+_EPS = 1e-6
+
+
+class BlockIndex:
+    """
+    Per-document index of OCR blocks for neighbour queries.
+
+    Blocks are partitioned by page and sorted by center y (then center x and
+    input position), so "same line" and "directly below" lookups bisect to a
+    narrow y band instead of scanning every block. The x-side of a query is a
+    plain filter over that band, which holds a line or two of text.
+
+    The same partition serves as the document's page model: per-page block
+    lists in reading or input order and each page's bottom edge are
+    available without re-filtering the whole block list per page.
+
+    Built once per document after OCR and passed to the extraction stages;
+    `blocks` holds the indexed blocks as `Block` objects, and callers that
+    compare blocks by identity must use those.
+    """
+
+    def __init__(self, blocks):
+        self.blocks = as_blocks(blocks)
+        self._pages = {}
+        for i, b in enumerate(self.blocks):
+            self._pages.setdefault(b.get("page"), []).append((b.cy, b.cx, i, b))
+        self._ys = {}
+        self._input_order = {}
+        self._ymax = {}
+        for page, entries in self._pages.items():
+            self._input_order[page] = [e[3] for e in entries]
+            self._ymax[page] = max(b.ymax for b in self._input_order[page])
+            entries.sort(key=lambda e: (e[0], e[1], e[2]))
+            self._ys[page] = [e[0] for e in entries]
+        self._corpus = None
+
+    @property
+    def corpus(self):
+        """
+        `TextCorpus` of the indexed blocks, built on first use.
+        """
+        if self._corpus is None:
+            self._corpus = TextCorpus(self.blocks)
+        return self._corpus
+
+    def page_blocks(self, page, reading_order=True):
+        """
+        Blocks of `page` in reading order (center y, then center x), or in
+        input order when `reading_order` is False.
+        """
+        if not reading_order:
+            return list(self._input_order.get(page, []))
+        return [e[3] for e in self._pages.get(page, [])]
+
+    def page_ymax(self, page):
+        """
+        Largest bbox y of any block on `page`, or None for an empty page.
+        """
+        return self._ymax.get(page)
+
+    def band(self, y_min, y_max, page=None):
+        """
+        Blocks whose center y lies in `[y_min, y_max]`, in input order.
+
+        Args:
+            y_min (float): top of the band
+            y_max (float): bottom of the band
+            page (int | None): restrict to one page; None searches all pages
+
+        Returns:
+            list[dict]: matching blocks, in the order they appear in `blocks`
+        """
+        pages = self._pages if page is None else ([page] if page in self._pages else [])
+        hits = []
+        for p in pages:
+            ys = self._ys[p]
+            lo = bisect_left(ys, y_min - _EPS)
+            hi = bisect_right(ys, y_max + _EPS)
+            hits.extend(self._pages[p][lo:hi])
+        hits.sort(key=lambda e: e[2])
+        return [e[3] for e in hits]
+
+    def below(self, page, y, y_down):
+        """
+        Blocks of `page` with center y in `(y, y + y_down]`, in reading order.
+        """
+        ys = self._ys.get(page)
+        if ys is None:
+            return []
+        lo = bisect_left(ys, y - _EPS)
+        hi = bisect_right(ys, y + y_down + _EPS)
+        return [e[3] for e in self._pages[page][lo:hi]]
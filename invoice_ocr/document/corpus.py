@@ -0,0 +1,27 @@
+class TextCorpus:
+    """
+    Whole-document text of a block list, joined once.
+
+    Document-level checks (classification, currency, variant, sections)
+    search the full text rather than single blocks; they read these views
+    instead of each re-joining every block.
+
+    Attributes:
+        raw (str): block texts joined by single spaces
+        raw_lower (str): `raw` lower-cased
+        normalized (str): whitespace-normalized block texts joined by spaces
+        normalized_lower (str): `normalized` lower-cased
+        ascii_ratio (float): share of ASCII characters in `raw`
+    """
+
+    def __init__(self, blocks):
+        self.raw = " ".join(b.get("text", "") for b in blocks)
+        self.raw_lower = self.raw.lower()
+        self.normalized = " ".join(b.norm for b in blocks)
+        self.normalized_lower = self.normalized.lower()
+
+        if not self.raw or self.raw.isascii():
+            self.ascii_ratio = 1.0 if self.raw else 0.0
+        else:
+            # Encoding drops non-ASCII characters in C instead of a Python loop.
+            self.ascii_ratio = len(self.raw.encode("ascii", "ignore")) / len(self.raw)
@@ -0,0 +1,199 @@
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import replace
+from pathlib import Path
+
+from invoice_ocr.ocr.run_text_ocr import get_ocr
+
+_pools = {}
+_engine = None
+
+
+def error_record(input_path, exc):
+    """
+    Result entry for a document that failed, so one bad file does not
+    abort the batch.
+    """
+    return {
+        "input": str(input_path),
+        "error": {
+            "type": type(exc).__name__,
+            "message": str(exc),
+        },
+    }
+
+
+def _worker_config(config):
+    # Documents already run in parallel; nested page pools would oversubscribe.
+    return replace(config, document_workers=1, ocr_workers=1)
+
+
+def _init_worker(config):
+    global _engine
+    from invoice_ocr.api import DocumentIntelligenceEngine
+
+    _engine = DocumentIntelligenceEngine(config=config)
+    get_ocr()
+
+
+def process_in_worker(input_path):
+    """
+    Runs one document on the worker's warm engine; errors propagate.
+    """
+    return _engine.process(input_path)
+
+
+def _process(input_path):
+    try:
+        return process_in_worker(input_path)
+    except Exception as exc:
+        return error_record(input_path, exc)
+
+
+def _pool_key(config):
+    return _worker_config(config), max(1, config.document_workers)
+
+
+def get_document_pool(config):
+    """
+    Returns a process pool of `config.document_workers` warm engines.
+
+    Pools are cached per config and live for the whole process.
+    """
+    key = _pool_key(config)
+    pool = _pools.get(key)
+    if pool is None:
+        worker_config, workers = key
+        pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(worker_config,),
+        )
+        _pools[key] = pool
+    return pool
+
+
+def _warm_worker(hold_s):
+    # Holding the worker briefly keeps one that is already warm from taking
+    # every warm-up job while the others are still loading models.
+    get_ocr()
+    time.sleep(hold_s)
+    return os.getpid()
+
+
+def warm_document_pool(config, hold_s=0.05):
+    """
+    Starts every worker of the pool for `config` and waits until each has
+    loaded its engine and PaddleOCR models.
+
+    `ProcessPoolExecutor` spawns workers only as jobs are submitted, so a new
+    pool is cold until each worker has run a job. Rounds of one job per
+    worker are submitted until every worker has answered.
+
+    Returns:
+        set: pids of the warm workers
+    """
+    pool = get_document_pool(config)
+    workers = max(1, config.document_workers)
+    seen = set()
+    while len(seen) < workers:
+        futures = [pool.submit(_warm_worker, hold_s) for _ in range(workers)]
+        seen.update(future.result() for future in futures)
+    return seen
+
+
+def _discard_pool(config):
+    pool = _pools.pop(_pool_key(config), None)
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def submit_document(config, fn, input_path):
+    """
+    Submits `fn(input_path)` to the warm pool for `config`.
+
+    A pool whose worker died (e.g. killed for memory) stays broken and
+    rejects every later submit; it is discarded and rebuilt here instead.
+    """
+    try:
+        return get_document_pool(config).submit(fn, input_path)
+    except BrokenProcessPool:
+        _discard_pool(config)
+        return get_document_pool(config).submit(fn, input_path)
+
+
+def reset_document_pool(config):
+    """
+    Replaces the pool for `config` with a fresh one.
+    """
+    _discard_pool(config)
+    return get_document_pool(config)
+
+
+def document_pool_healthy(config):
+    """
+    False when the pool for `config` has a dead worker and cannot run jobs.
+    """
+    pool = _pools.get(_pool_key(config))
+    return pool is None or not getattr(pool, "_broken", False)
+
+
+def _result(future, input_path):
+    try:
+        return future.result()
+    except BrokenProcessPool as exc:
+        return error_record(input_path, exc)
+
+
+def iter_documents_parallel(input_paths, config, ordered=True, max_in_flight=None):
+    """
+    Processes documents across warm worker processes.
+
+    At most `max_in_flight` documents are submitted at a time, so inputs are
+    pulled lazily and finished results are not buffered beyond that window.
+    If a worker process dies, the documents in flight at that moment become
+    error records and the pool is rebuilt for the rest.
+
+    Yields:
+        tuple: `(input_path, result_or_error_record)`, in input order when
+        `ordered`, otherwise as documents finish
+    """
+    workers = max(1, config.document_workers)
+    max_in_flight = max(workers, max_in_flight or 2 * workers)
+    pending = deque() if ordered else {}
+
+    def submit(input_path):
+        future = submit_document(config, _process, input_path)
+        if ordered:
+            pending.append((future, input_path))
+        else:
+            pending[future] = input_path
+
+    def drain(block_until_below):
+        while len(pending) >= block_until_below and pending:
+            if ordered:
+                future, input_path = pending.popleft()
+                yield input_path, _result(future, input_path)
+                continue
+
+            done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+            for future in done:
+                input_path = pending.pop(future)
+                yield input_path, _result(future, input_path)
+
+    for input_path in input_paths:
+        submit(Path(input_path))
+        yield from drain(max_in_flight)
+
+    yield from drain(1)
+
+
+def shutdown_document_pools():
+    for pool in _pools.values():
+        pool.shutdown(wait=True)
+    _pools.clear()
@@ -0,0 +1,75 @@
+from invoice_ocr.ocr.ocr_cache import page_cache_key
+from invoice_ocr.ocr.run_text_ocr import (
+    detect_text,
+    page_result,
+    paddle_internals,
+    recognize_crops,
+    run_text_ocr,
+)
+
+
+def ocr_images_batched(
+    image_refs,
+    enable_deskew=True,
+    batch_size=32,
+    cache=None,
+    settings=None,
+    deskew_method="min_area_rect",
+    deskew_precheck=False,
+):
+    """
+    OCR several page images with one batched recognition pass.
+
+    Text detection runs per page; the crops of every page are then fed to
+    the angle classifier and recognizer together in `batch_size` batches and
+    scattered back per page. Pages found in `cache` are not recomputed.
+
+    Returns:
+        list[tuple]: `(result, preprocess_meta)` per image, in input order,
+        matching `run_text_ocr(..., return_meta=True)`
+    """
+    internals = paddle_internals()
+    outputs = [None] * len(image_refs)
+    keys = [None] * len(image_refs)
+    detected = []
+
+    for i, image_ref in enumerate(image_refs):
+        if cache is not None:
+            keys[i] = page_cache_key(image_ref, settings)
+            cached = cache.get(keys[i])
+            if cached is not None:
+                result, meta = cached
+                outputs[i] = (result, {**meta, "ocr_cache": "hit"})
+                continue
+
+        if internals is None:
+            outputs[i] = run_text_ocr(
+                image_ref,
+                enable_deskew=enable_deskew,
+                return_meta=True,
+                deskew_method=deskew_method,
+                deskew_precheck=deskew_precheck,
+            )
+        else:
+            boxes, crops, meta = detect_text(
+                internals, image_ref, enable_deskew, deskew_method, deskew_precheck
+            )
+            detected.append((i, boxes, crops, meta))
+
+    if detected:
+        all_crops = [crop for _, _, crops, _ in detected for crop in crops]
+        rec_res = recognize_crops(internals, all_crops, batch_size)
+        offset = 0
+        for i, boxes, crops, meta in detected:
+            page_rec = rec_res[offset:offset + len(crops)]
+            offset += len(crops)
+            outputs[i] = (page_result(internals[0], boxes, page_rec), meta)
+
+    if cache is not None:
+        for i, (result, meta) in enumerate(outputs):
+            if "ocr_cache" in meta:
+                continue
+            cache.put(keys[i], (result, meta))
+            outputs[i] = (result, {**meta, "ocr_cache": "miss"})
+
+    return outputs
@@ -0,0 +1,71 @@
+import hashlib
+from pathlib import Path
+
+import numpy as np
+
+from invoice_ocr.ocr.run_text_ocr import ocr_model_id, run_text_ocr
+from invoice_ocr.utils.disk_cache import cache_key, file_sha256
+
+
+def _image_sha256(image_ref):
+    if isinstance(image_ref, np.ndarray):
+        digest = hashlib.sha256()
+        digest.update(f"{image_ref.shape}:{image_ref.dtype}".encode("ascii"))
+        digest.update(np.ascontiguousarray(image_ref).data)
+        return digest.hexdigest()
+    return file_sha256(Path(image_ref))
+
+
+def page_cache_key(image_ref, settings):
+    """
+    Key for one rendered page: pixel hash + OCR settings + model identity.
+    """
+    return cache_key("page", _image_sha256(image_ref), settings, ocr_model_id())
+
+
+def document_cache_key(input_path, settings):
+    """
+    Key for a whole document's OCR result: file hash + settings + model identity.
+    """
+    return cache_key("document", file_sha256(input_path), settings, ocr_model_id())
+
+
+def ocr_page_cached(
+    image_ref,
+    enable_deskew=True,
+    cache=None,
+    settings=None,
+    deskew_method="min_area_rect",
+    deskew_precheck=False,
+):
+    """
+    `run_text_ocr` with an optional page-level block cache in front of it.
+
+    Returns:
+        tuple: `(result, preprocess_meta)`; the meta records `ocr_cache`
+        as "hit" or "miss" when a cache is given
+    """
+    if cache is None:
+        return run_text_ocr(
+            image_ref,
+            enable_deskew=enable_deskew,
+            return_meta=True,
+            deskew_method=deskew_method,
+            deskew_precheck=deskew_precheck,
+        )
+
+    key = page_cache_key(image_ref, settings)
+    cached = cache.get(key)
+    if cached is not None:
+        result, meta = cached
+        return result, {**meta, "ocr_cache": "hit"}
+
+    result, meta = run_text_ocr(
+        image_ref,
+        enable_deskew=enable_deskew,
+        return_meta=True,
+        deskew_method=deskew_method,
+        deskew_precheck=deskew_precheck,
+    )
+    cache.put(key, (result, meta))
+    return result, {**meta, "ocr_cache": "miss"}
@@ -0,0 +1,130 @@
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from invoice_ocr.ocr.ocr_cache import ocr_page_cached
+from invoice_ocr.ocr.run_text_ocr import get_ocr
+
+_pools = {}
+
+
+def _warm_worker():
+    # Load PaddleOCR once per worker process so every page reuses warm models.
+    get_ocr()
+
+
+def _ocr_page(image_ref, enable_deskew, cache, settings, deskew_method, deskew_precheck):
+    return ocr_page_cached(
+        image_ref,
+        enable_deskew=enable_deskew,
+        cache=cache,
+        settings=settings,
+        deskew_method=deskew_method,
+        deskew_precheck=deskew_precheck,
+    )
+
+
+def get_page_pool(workers):
+    """
+    Returns a process pool of `workers` warm OCR workers.
+
+    Pools are cached per worker count and live for the whole process, so
+    repeated documents do not pay PaddleOCR model load again.
+    """
+    pool = _pools.get(workers)
+    if pool is None:
+        pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_warm_worker,
+        )
+        _pools[workers] = pool
+    return pool
+
+
+def _discard_pool(workers, pool):
+    if _pools.get(workers) is pool:
+        del _pools[workers]
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _submit(workers, args):
+    """
+    Submits one page to the warm pool; returns `(future, pool)`.
+
+    A pool whose worker died (e.g. killed for memory) stays broken and
+    rejects every later submit; it is discarded and rebuilt here instead.
+    """
+    pool = get_page_pool(workers)
+    try:
+        return pool.submit(_ocr_page, *args), pool
+    except BrokenProcessPool:
+        _discard_pool(workers, pool)
+        pool = get_page_pool(workers)
+        return pool.submit(_ocr_page, *args), pool
+
+
+def ocr_pages_parallel(
+    image_refs,
+    enable_deskew=True,
+    workers=2,
+    max_in_flight=None,
+    cache=None,
+    settings=None,
+    deskew_method="min_area_rect",
+    deskew_precheck=False,
+):
+    """
+    OCRs pages across the warm worker pool.
+
+    At most `max_in_flight` pages are submitted at once, so pages are pulled
+    from `image_refs` lazily and released as soon as their result is yielded.
+    None entries are not submitted and yield None in their position.
+
+    If a worker dies, the pool is rebuilt and the pages that were in flight
+    are submitted again, once per call; a second crash raises
+    `BrokenProcessPool`.
+
+    Yields:
+        tuple: `(result, preprocess_meta)` per page, in input order
+    """
+    max_in_flight = max(workers, max_in_flight or workers)
+    # Entries are None or `[future, pool, args]`.
+    pending = deque()
+    retried = False
+
+    def result(entry):
+        nonlocal retried
+        while True:
+            try:
+                return entry[0].result()
+            except BrokenProcessPool:
+                _discard_pool(workers, entry[1])
+                if retried:
+                    raise
+                retried = True
+                # Every page in flight was lost with the broken pool.
+                for lost in (entry, *pending):
+                    if lost is not None:
+                        lost[0], lost[1] = _submit(workers, lost[2])
+
+    for image_ref in image_refs:
+        if image_ref is None:
+            pending.append(None)
+        else:
+            args = (image_ref, enable_deskew, cache, settings, deskew_method, deskew_precheck)
+            pending.append([*_submit(workers, args), args])
+        while len(pending) >= max_in_flight or (pending and pending[0] is None):
+            entry = pending.popleft()
+            yield result(entry) if entry is not None else None
+
+    while pending:
+        entry = pending.popleft()
+        yield result(entry) if entry is not None else None
+
+
+def shutdown_page_pools():
+    for pool in _pools.values():
+        pool.shutdown(wait=True)
+    _pools.clear()
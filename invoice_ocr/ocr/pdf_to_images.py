@@ -2,9 +2,13 @@
 import tempfile
 from pathlib import Path
 
-from pdf2image import convert_from_path
+import cv2
+import numpy as np
+from pdf2image import convert_from_path, pdfinfo_from_path
 from pdf2image.exceptions import PDFInfoNotInstalledError
 
+RENDER_DPI = 300
+
 
 def _normalize_poppler_bin(path_value):
     if not path_value:
@@ -49,10 +53,92 @@ def _resolve_poppler_path():
     return None
 
 
+def _poppler_kwargs():
+    poppler_path = _resolve_poppler_path()
+    if poppler_path:
+        return {"poppler_path": poppler_path}
+    return {}
+
+
+def _poppler_missing_error():
+    return RuntimeError(
+        "Poppler is required for PDF OCR. Install Poppler and either add its 'bin' "
+        "folder to PATH or set POPPLER_PATH to that folder. Example: "
+        "$env:POPPLER_PATH='C:\\poppler\\Library\\bin'"
+    )
+
+
+def _render_pages(pdf_path, dpi=RENDER_DPI, first_page=None, last_page=None):
+    kwargs = {"dpi": dpi, **_poppler_kwargs()}
+    if first_page is not None:
+        kwargs["first_page"] = first_page
+    if last_page is not None:
+        kwargs["last_page"] = last_page
+
+    try:
+        return convert_from_path(str(pdf_path), **kwargs)
+    except PDFInfoNotInstalledError as exc:
+        raise _poppler_missing_error() from exc
+
+
+def pdf_page_count(pdf_path):
+    try:
+        info = pdfinfo_from_path(str(pdf_path), **_poppler_kwargs())
+    except PDFInfoNotInstalledError as exc:
+        raise _poppler_missing_error() from exc
+    return int(info["Pages"])
+
+
+def _to_bgr_array(page):
+    # Same pixel layout cv2.imread returns for the PNG written by pdf_to_images.
+    rgb = np.asarray(page.convert("RGB"))
+    return cv2.cvtColor(rgb, cv2.COLOR_RGB2BGR)
+
+
+def _page_ranges(page_numbers, window):
+    ranges = []
+    for page_num in sorted(set(page_numbers)):
+        if ranges and page_num == ranges[-1][1] + 1 and page_num - ranges[-1][0] < window:
+            ranges[-1][1] = page_num
+        else:
+            ranges.append([page_num, page_num])
+    return ranges
+
+
+def iter_pdf_pages(pdf_path, dpi=RENDER_DPI, window=4, page_numbers=None):
+    """
+    Render PDF pages straight to decoded arrays, without touching disk.
+
+    Pages are rendered `window` at a time via first_page/last_page ranges,
+    so peak memory depends on the window, not on document length.
+
+    Args:
+        pdf_path (Path): input PDF
+        dpi (int): render resolution
+        window (int): pages rendered per Poppler call
+        page_numbers (Iterable[int] | None): 1-based pages to render; all when None
+
+    Yields:
+        tuple[int, np.ndarray]: 1-based page number and BGR page image
+    """
+    window = max(1, int(window))
+    if page_numbers is None:
+        page_numbers = range(1, pdf_page_count(pdf_path) + 1)
+
+    for first, last in _page_ranges(page_numbers, window):
+        pages = _render_pages(pdf_path, dpi=dpi, first_page=first, last_page=last)
+        for i in range(len(pages)):
+            page, pages[i] = pages[i], None
+            yield first + i, _to_bgr_array(page)
+
+
 def pdf_to_images(pdf_path, out_dir=None):
     """
     Convert PDF to images.
 
+    Writes one PNG per page. The OCR pipeline only uses this when page
+    images are requested for debugging; otherwise see `iter_pdf_pages`.
+
     Args:
         pdf_path (Path): input PDF
         out_dir (Path | None): optional output directory
@@ -67,19 +153,7 @@ def pdf_to_images(pdf_path, out_dir=None):
         out_dir = Path(out_dir)
         out_dir.mkdir(parents=True, exist_ok=True)
 
-    poppler_path = _resolve_poppler_path()
-    kwargs = {"dpi": 300}
-    if poppler_path:
-        kwargs["poppler_path"] = poppler_path
-
-    try:
-        pages = convert_from_path(str(pdf_path), **kwargs)
-    except PDFInfoNotInstalledError as exc:
-        raise RuntimeError(
-            "Poppler is required for PDF OCR. Install Poppler and either add its 'bin' "
-            "folder to PATH or set POPPLER_PATH to that folder. Example: "
-            "$env:POPPLER_PATH='C:\\poppler\\Library\\bin'"
-        ) from exc
+    pages = _render_pages(pdf_path)
 
     image_paths = []
     for i, page in enumerate(pages, start=1):
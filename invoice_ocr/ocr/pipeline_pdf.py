@@ -1,33 +1,301 @@
-from invoice_ocr.ocr.run_text_ocr import run_text_ocr
-from invoice_ocr.ocr.pdf_to_images import pdf_to_images
+import time
+from collections import deque
+from pathlib import Path
 
+from invoice_ocr.ocr.ocr_cache import document_cache_key, ocr_page_cached
+from invoice_ocr.ocr.pdf_to_images import RENDER_DPI, iter_pdf_pages, pdf_to_images
 
-def run_ocr(input_path, enable_deskew=True):
-    pages = pdf_to_images(input_path)
-    all_pages = []
-    all_blocks = []
-    preprocess_pages = []
+# Adaptive DPI: a low-resolution page is kept only if its median text line is
+# at least this tall (in rendered pixels) and OCR is this confident on average.
+MIN_TEXT_HEIGHT_PX = 16
+MIN_MEAN_CONFIDENCE = 0.9
+
+
+def _iter_pages(
+    input_path,
+    save_page_images=False,
+    page_image_dir=None,
+    page_window=4,
+    page_numbers=None,
+    dpi=RENDER_DPI,
+):
+    """
+    Yields `(page_num, image_name, image)` per page.
+
+    By default pages stream from the renderer as decoded arrays, `page_window`
+    pages at a time. Writing PNGs to disk is a debug option only, and always
+    renders at `RENDER_DPI`.
+    """
+    if save_page_images:
+        image_paths = pdf_to_images(input_path, out_dir=page_image_dir)
+        for page_num, image_path in enumerate(image_paths, start=1):
+            if page_numbers is None or page_num in page_numbers:
+                yield page_num, image_path.name, image_path
+        return
+
+    for page_num, image in iter_pdf_pages(
+        input_path, dpi=dpi, window=page_window, page_numbers=page_numbers
+    ):
+        yield page_num, f"page-{page_num}.png", image
+
+
+def _ocr_stream(
+    items,
+    enable_deskew=True,
+    workers=1,
+    page_window=4,
+    rec_batch_size=0,
+    cache=None,
+    settings=None,
+    deskew_method="min_area_rect",
+    deskew_precheck=False,
+):
+    """
+    OCRs a stream of `(tag, image)` items, yielding `(tag, result, meta)`.
+
+    Output order always matches input order. Items whose image is None are
+    markers: they pass through untouched with `result` and `meta` None.
+    """
+    if workers > 1:
+        from invoice_ocr.ocr.page_pool import ocr_pages_parallel
+
+        tags = deque()
+
+        def images():
+            for tag, image in items:
+                tags.append(tag)
+                yield image
+
+        results = ocr_pages_parallel(
+            images(),
+            enable_deskew=enable_deskew,
+            workers=workers,
+            max_in_flight=page_window,
+            cache=cache,
+            settings=settings,
+            deskew_method=deskew_method,
+            deskew_precheck=deskew_precheck,
+        )
+        for output in results:
+            result, meta = output if output is not None else (None, None)
+            yield tags.popleft(), result, meta
+        return
+
+    if rec_batch_size > 0:
+        from invoice_ocr.ocr.batch_ocr import ocr_images_batched
 
-    for page_num, image_path in enumerate(pages, start=1):
-        result, preprocess_meta = run_text_ocr(
-            image_path,
+        items = iter(items)
+        window = max(1, page_window)
+        while True:
+            chunk = []
+            page_count = 0
+            for tag, image in items:
+                chunk.append((tag, image))
+                if image is not None:
+                    page_count += 1
+                    if page_count >= window:
+                        break
+            if not chunk:
+                return
+
+            outputs = iter(ocr_images_batched(
+                [image for _, image in chunk if image is not None],
+                enable_deskew=enable_deskew,
+                batch_size=rec_batch_size,
+                cache=cache,
+                settings=settings,
+                deskew_method=deskew_method,
+                deskew_precheck=deskew_precheck,
+            ))
+            for tag, image in chunk:
+                if image is None:
+                    yield tag, None, None
+                else:
+                    result, meta = next(outputs)
+                    yield tag, result, meta
+
+    for tag, image in items:
+        if image is None:
+            yield tag, None, None
+            continue
+        result, meta = ocr_page_cached(
+            image,
             enable_deskew=enable_deskew,
-            return_meta=True,
+            cache=cache,
+            settings=settings,
+            deskew_method=deskew_method,
+            deskew_precheck=deskew_precheck,
+        )
+        yield tag, result, meta
+
+
+def _ocr_blocks(result, page_num, scale=1.0):
+    blocks = []
+    for line in result[0] or []:
+        bbox, (text, confidence) = line
+        if scale != 1.0:
+            bbox = [[round(x * scale, 2), round(y * scale, 2)] for x, y in bbox]
+        blocks.append({
+            "text": text,
+            "confidence": round(confidence, 3),
+            "bbox": bbox,
+            "page": page_num
+        })
+    return blocks
+
+
+def _needs_full_dpi(result):
+    """
+    True when a low-DPI OCR result is too small or too uncertain to keep.
+
+    Pages with no detected text are kept: they are the blank continuation
+    pages adaptive DPI is meant to make cheap.
+    """
+    lines = result[0] or []
+    if not lines:
+        return False
+
+    heights = sorted(
+        max(y for _, y in bbox) - min(y for _, y in bbox)
+        for bbox, _ in lines
+    )
+    median_height = heights[len(heights) // 2]
+    mean_confidence = sum(conf for _, (_, conf) in lines) / len(lines)
+    return median_height < MIN_TEXT_HEIGHT_PX or mean_confidence < MIN_MEAN_CONFIDENCE
+
+
+def _refine_pages(doc, page_window=4, cache=None, settings=None, **stream_options):
+    """
+    Re-renders at `RENDER_DPI` and re-OCRs the low-DPI pages of `doc` that
+    fail `_needs_full_dpi`.
+    """
+    retry = [
+        page_num
+        for page_num, (_, result, meta) in doc["ocr_pages"].items()
+        if meta["dpi"] != RENDER_DPI and _needs_full_dpi(result)
+    ]
+    if not retry:
+        return
+
+    items = (
+        ((page_num, image_name), image)
+        for page_num, image_name, image in _iter_pages(
+            doc["input_path"],
+            page_window=page_window,
+            page_numbers=retry,
         )
+    )
+    for (page_num, image_name), result, meta in _ocr_stream(
+        items,
+        page_window=page_window,
+        cache=cache,
+        settings=settings,
+        **stream_options,
+    ):
+        doc["ocr_pages"][page_num] = (image_name, result, {
+            **meta,
+            "dpi": RENDER_DPI,
+            "rerendered": True,
+        })
+
+
+def _plan_document(input_path, use_text_layer=False, cache=None, settings=None):
+    """
+    Decides, before rendering, what a document needs from OCR.
 
-        blocks = []
-        for line in result[0]:
-            bbox, (text, confidence) = line
-            blocks.append({
-                "text": text,
-                "confidence": round(confidence, 3),
-                "bbox": bbox,
-                "page": page_num
+    Returns a per-document state dict holding either the cached OCR result
+    or the text-layer pages (when requested) plus a slot for OCR'd pages.
+    """
+    doc = {
+        "input_path": input_path,
+        "start": time.time(),
+        "layer": {},
+        "ocr_pages": {},
+        "cached": None,
+        "key": None,
+    }
+
+    if cache is not None:
+        doc["key"] = document_cache_key(
+            input_path, {**settings, "use_text_layer": bool(use_text_layer)}
+        )
+        doc["cached"] = cache.get(doc["key"])
+        if doc["cached"] is not None:
+            return doc
+
+    if use_text_layer:
+        from invoice_ocr.ocr.text_layer import extract_text_layer
+
+        doc["layer"] = extract_text_layer(input_path)
+    return doc
+
+
+def _document_items(
+    docs,
+    save_page_images=False,
+    page_image_dir=None,
+    page_window=4,
+    dpi=RENDER_DPI,
+):
+    """
+    Yields `((doc, page_num, image_name), image)` for every page that needs
+    OCR, then a `((doc, None, None), None)` end marker per document.
+    """
+    for doc in docs:
+        if doc["cached"] is None:
+            layer = doc["layer"]
+            page_numbers = None
+            if layer:
+                page_numbers = [n for n, blocks in layer.items() if blocks is None]
+
+            if page_numbers is None or page_numbers:
+                for page_num, image_name, image in _iter_pages(
+                    doc["input_path"],
+                    save_page_images=save_page_images,
+                    page_image_dir=page_image_dir,
+                    page_window=page_window,
+                    page_numbers=page_numbers,
+                    dpi=dpi,
+                ):
+                    yield (doc, page_num, image_name), image
+
+        yield (doc, None, None), None
+
+
+def _build_ocr_result(doc, enable_deskew=True, cache=None):
+    if doc["cached"] is not None:
+        ocr_result = doc["cached"]
+        ocr_result["cache"] = {"document": "hit"}
+        return ocr_result
+
+    entries = {}
+    for page_num, blocks in doc["layer"].items():
+        if blocks is not None:
+            entries[page_num] = (f"page-{page_num}.png", blocks, {
+                "source": "text_layer",
+                "deskew": {"applied": False, "enabled": bool(enable_deskew)},
             })
+    for page_num, (image_name, result, meta) in doc["ocr_pages"].items():
+        scale = RENDER_DPI / meta.get("dpi", RENDER_DPI)
+        entries[page_num] = (image_name, _ocr_blocks(result, page_num, scale), {
+            "source": "ocr",
+            **meta,
+        })
+
+    all_pages = []
+    all_blocks = []
+    preprocess_pages = []
+    page_cache = {"hit": 0, "miss": 0}
+
+    for page_num in sorted(entries):
+        image_name, blocks, preprocess_meta = entries[page_num]
+        flag = preprocess_meta.pop("ocr_cache", None)
+        if flag in page_cache:
+            page_cache[flag] += 1
 
         all_pages.append({
             "page": page_num,
-            "image": image_path.name,
+            "image": image_name,
             "blocks": blocks
         })
         preprocess_pages.append({
@@ -36,7 +304,7 @@ def run_ocr(input_path, enable_deskew=True):
         })
         all_blocks.extend(blocks)
 
-    return {
+    ocr_result = {
         "pages": all_pages,
         "blocks": all_blocks,
         "preprocess": {
@@ -46,3 +314,114 @@ def run_ocr(input_path, enable_deskew=True):
             }
         },
     }
+    if cache is not None:
+        cache.put(doc["key"], ocr_result)
+        ocr_result["cache"] = {
+            "document": "miss",
+            "page_hits": page_cache["hit"],
+            "page_misses": page_cache["miss"],
+        }
+    return ocr_result
+
+
+def run_ocr_many(
+    input_paths,
+    enable_deskew=True,
+    workers=1,
+    save_page_images=False,
+    page_image_dir=None,
+    page_window=4,
+    use_text_layer=False,
+    ocr_cache=None,
+    rec_batch_size=0,
+    low_dpi=None,
+    deskew_method="min_area_rect",
+    deskew_precheck=False,
+):
+    """
+    Phase 1-2 for several documents over one shared page stream.
+
+    Pages of consecutive documents share the worker pool and recognition
+    batches, so short documents still fill a batch. With `ocr_cache` (a
+    DiskCache), a document seen before with the same settings is returned
+    without rendering, and pages whose pixels were OCR'd before reuse their
+    cached blocks.
+
+    With `low_dpi`, pages are first rendered at that resolution; pages whose
+    text comes out too small or uncertain are re-rendered at `RENDER_DPI`.
+    Bboxes are always returned in `RENDER_DPI` pixel space and each page's
+    preprocess meta records the `dpi` it was read at.
+
+    Yields:
+        tuple: `(input_path, ocr_result, start_time)` per document, in input order
+    """
+    settings = {
+        "dpi": RENDER_DPI,
+        "enable_deskew": bool(enable_deskew),
+        "deskew_method": deskew_method,
+        "deskew_precheck": bool(deskew_precheck),
+        # Crops batched across pages are padded together, so batched
+        # recognition is not guaranteed to match per-page results.
+        "rec_batch_size": rec_batch_size,
+    }
+    doc_settings = settings
+    render_dpi = RENDER_DPI
+    if low_dpi and not save_page_images:
+        render_dpi = low_dpi
+        doc_settings = {**settings, "low_dpi": low_dpi}
+
+    docs = (
+        _plan_document(
+            Path(input_path),
+            use_text_layer=use_text_layer,
+            cache=ocr_cache,
+            settings=doc_settings,
+        )
+        for input_path in input_paths
+    )
+    items = _document_items(
+        docs,
+        save_page_images=save_page_images,
+        page_image_dir=page_image_dir,
+        page_window=page_window,
+        dpi=render_dpi,
+    )
+    stream_options = {
+        "enable_deskew": enable_deskew,
+        "workers": workers,
+        "rec_batch_size": rec_batch_size,
+        "deskew_method": deskew_method,
+        "deskew_precheck": deskew_precheck,
+    }
+
+    for (doc, page_num, image_name), result, meta in _ocr_stream(
+        items,
+        page_window=page_window,
+        cache=ocr_cache,
+        settings={**settings, "dpi": render_dpi},
+        **stream_options,
+    ):
+        if page_num is not None:
+            if render_dpi != RENDER_DPI:
+                meta = {**meta, "dpi": render_dpi, "rerendered": False}
+            doc["ocr_pages"][page_num] = (image_name, result, meta)
+            continue
+
+        if render_dpi != RENDER_DPI:
+            _refine_pages(
+                doc,
+                page_window=page_window,
+                cache=ocr_cache,
+                settings=settings,
+                **stream_options,
+            )
+        ocr_result = _build_ocr_result(doc, enable_deskew=enable_deskew, cache=ocr_cache)
+        yield doc["input_path"], ocr_result, doc["start"]
+
+
+def run_ocr(input_path, **kwargs):
+    """
+    Phase 1-2 for a single document; see `run_ocr_many` for options.
+    """
+    _, ocr_result, _ = next(run_ocr_many([input_path], **kwargs))
+    return ocr_result
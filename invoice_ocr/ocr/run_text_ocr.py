@@ -1,6 +1,10 @@
+import copy
+from importlib import metadata
+
 import cv2
+import numpy as np
 
-from invoice_ocr.preprocess.deskew import deskew_image
+from invoice_ocr.preprocess.deskew import correct_skew, deskew_image, estimate_angle_from_boxes
 
 _ocr = None
 
@@ -25,16 +29,197 @@ def get_ocr():
     return _ocr
 
 
-def run_text_ocr(image_path, enable_deskew=True, return_meta=False):
-    ocr = get_ocr()
-    img = cv2.imread(str(image_path))
+def ocr_model_id():
+    """
+    Identity of the OCR models, used to key cached OCR output.
+    """
+    try:
+        version = metadata.version("paddleocr")
+    except metadata.PackageNotFoundError:
+        version = "unknown"
+    return f"paddleocr-{version}:en:angle_cls"
+
+
+def prepare_image(
+    image_path,
+    enable_deskew=True,
+    deskew_method="min_area_rect",
+    deskew_precheck=False,
+):
+    """
+    Load a page image (path or array) and apply pre-OCR deskew.
+
+    With the "detector" method the image is returned as is; the skew is
+    measured later from detection boxes (see `detector_deskew`).
+
+    Returns:
+        tuple: `(image, preprocess_meta)`
+    """
+    if isinstance(image_path, np.ndarray):
+        img = image_path
+    else:
+        img = cv2.imread(str(image_path))
     meta = {"deskew": {"applied": False, "enabled": bool(enable_deskew)}}
-    if enable_deskew:
-        img, deskew_meta = deskew_image(img)
+    if enable_deskew and deskew_method == "detector":
+        meta["deskew"]["method"] = "detector"
+    elif enable_deskew:
+        img, deskew_meta = deskew_image(img, method=deskew_method, precheck=deskew_precheck)
         deskew_meta["enabled"] = True
         meta["deskew"] = deskew_meta
+    return img, meta
+
+
+def detector_deskew(img, boxes, meta):
+    """
+    Corrects skew measured from the text boxes already detected on `img`.
+
+    Updates `meta` in place. Returns the (possibly rotated) image and whether
+    it was rotated, in which case detection must be re-run on it.
+    """
+    angle = estimate_angle_from_boxes(boxes)
+    if angle is None:
+        return img, False
+    img, deskew_meta = correct_skew(img, angle, "detector")
+    deskew_meta["enabled"] = True
+    meta["deskew"] = deskew_meta
+    return img, deskew_meta["applied"]
+
+
+def paddle_internals():
+    """
+    PaddleOCR helpers needed to split detection from recognition.
+
+    Returns None when the installed PaddleOCR does not expose them, in which
+    case callers fall back to `ocr.ocr` calls.
+    """
+    ocr = get_ocr()
+    if not all(hasattr(ocr, name) for name in ("text_detector", "text_recognizer")):
+        return None
+    try:
+        from tools.infer.predict_system import sorted_boxes
+        from tools.infer.utility import get_minarea_rect_crop, get_rotate_crop_image
+    except ImportError:
+        return None
+    return ocr, sorted_boxes, get_rotate_crop_image, get_minarea_rect_crop
+
+
+def detect_text(
+    internals,
+    image_ref,
+    enable_deskew,
+    deskew_method="min_area_rect",
+    deskew_precheck=False,
+):
+    """
+    Text detection and line crops for one page, without recognition.
 
-    result = ocr.ocr(img, cls=True)
+    With the "detector" deskew method the page's skew is measured from these
+    boxes; detection runs a second time only when the page was rotated.
+
+    Returns:
+        tuple: `(boxes, crops, preprocess_meta)`
+    """
+    ocr, sorted_boxes, get_rotate_crop_image, get_minarea_rect_crop = internals
+    img, meta = prepare_image(
+        image_ref,
+        enable_deskew=enable_deskew,
+        deskew_method=deskew_method,
+        deskew_precheck=deskew_precheck,
+    )
+    dt_boxes, _ = ocr.text_detector(img)
+    if dt_boxes is None or len(dt_boxes) == 0:
+        return [], [], meta
+
+    if enable_deskew and deskew_method == "detector":
+        img, rotated = detector_deskew(img, sorted_boxes(dt_boxes), meta)
+        if rotated:
+            dt_boxes, _ = ocr.text_detector(img)
+            if dt_boxes is None or len(dt_boxes) == 0:
+                return [], [], meta
+
+    quad = getattr(getattr(ocr, "args", None), "det_box_type", "quad") == "quad"
+    dt_boxes = sorted_boxes(dt_boxes)
+    crops = []
+    for box in dt_boxes:
+        box = copy.deepcopy(box)
+        crops.append(get_rotate_crop_image(img, box) if quad else get_minarea_rect_crop(img, box))
+    return dt_boxes, crops, meta
+
+
+def recognize_crops(internals, crops, batch_size=None):
+    """
+    Angle classification and recognition of text-line crops.
+
+    `batch_size` overrides the classifier/recognizer batch sizes for this
+    call; None keeps PaddleOCR's configured ones.
+    """
+    ocr = internals[0]
+    if not crops:
+        return []
+    use_cls = getattr(ocr, "use_angle_cls", False)
+    # `get_ocr()` is shared; restore the batch sizes for later `ocr.ocr` calls.
+    rec_batch_num = ocr.text_recognizer.rec_batch_num
+    cls_batch_num = ocr.text_classifier.cls_batch_num if use_cls else None
+    try:
+        if batch_size is not None:
+            ocr.text_recognizer.rec_batch_num = batch_size
+            if use_cls:
+                ocr.text_classifier.cls_batch_num = batch_size
+        if use_cls:
+            crops, _, _ = ocr.text_classifier(crops)
+        rec_res, _ = ocr.text_recognizer(crops)
+    finally:
+        ocr.text_recognizer.rec_batch_num = rec_batch_num
+        if use_cls:
+            ocr.text_classifier.cls_batch_num = cls_batch_num
+    return rec_res
+
+
+def page_result(ocr, boxes, rec_res):
+    drop_score = getattr(ocr, "drop_score", None)
+    if drop_score is None:
+        drop_score = getattr(getattr(ocr, "args", None), "drop_score", 0.5)
+    lines = [
+        [box.tolist(), res]
+        for box, res in zip(boxes, rec_res)
+        if res[1] >= drop_score
+    ]
+    # Same shape as `ocr.ocr(img, cls=True)` for a single image.
+    return [lines or None]
+
+
+def run_text_ocr(
+    image_path,
+    enable_deskew=True,
+    return_meta=False,
+    deskew_method="min_area_rect",
+    deskew_precheck=False,
+):
+    ocr = get_ocr()
+    internals = None
+    if enable_deskew and deskew_method == "detector":
+        internals = paddle_internals()
+
+    if internals is not None:
+        # The boxes that measured the skew are cropped and recognized directly.
+        boxes, crops, meta = detect_text(
+            internals, image_path, enable_deskew, deskew_method, deskew_precheck
+        )
+        result = page_result(ocr, boxes, recognize_crops(internals, crops))
+    else:
+        img, meta = prepare_image(
+            image_path,
+            enable_deskew=enable_deskew,
+            deskew_method=deskew_method,
+            deskew_precheck=deskew_precheck,
+        )
+        result = ocr.ocr(img, cls=True)
+        if enable_deskew and deskew_method == "detector":
+            # Without the split helpers, OCR runs again only on rotated pages.
+            boxes = [line[0] for line in result[0] or []]
+            img, rotated = detector_deskew(img, boxes, meta)
+            if rotated:
+                result = ocr.ocr(img, cls=True)
     if return_meta:
         return result, meta
     return result
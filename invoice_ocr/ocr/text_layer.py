@@ -0,0 +1,168 @@
+import shutil
+import subprocess
+import unicodedata
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+from invoice_ocr.ocr.pdf_to_images import RENDER_DPI, _resolve_poppler_path
+
+PDF_POINTS_PER_INCH = 72.0
+
+# A word gap wider than this many line heights starts a new block, which
+# mirrors how the OCR detector splits label/value pairs on the same line.
+PHRASE_GAP_RATIO = 1.0
+
+MIN_PAGE_ALNUM = 20
+MIN_CLEAN_RATIO = 0.9
+
+
+def _pdftotext_executable():
+    poppler_path = _resolve_poppler_path()
+    if poppler_path:
+        candidate = Path(poppler_path) / "pdftotext.exe"
+        if candidate.exists():
+            return str(candidate)
+    return shutil.which("pdftotext")
+
+
+def _local_name(tag):
+    return tag.rsplit("}", 1)[-1]
+
+
+def _is_clean_char(ch):
+    if ch.isspace() or ch.isalnum():
+        return True
+    category = unicodedata.category(ch)
+    # Control, private-use and unassigned code points come from broken font
+    # encodings (e.g. CID fonts without a ToUnicode map).
+    if category in ("Cc", "Co", "Cn", "Cs") or ch == "\ufffd":
+        return False
+    return True
+
+
+def is_usable_text(text, min_alnum=MIN_PAGE_ALNUM, min_clean_ratio=MIN_CLEAN_RATIO):
+    """
+    Decide whether a page's embedded text can stand in for OCR.
+    """
+    if not text:
+        return False
+    if "(cid:" in text:
+        return False
+
+    alnum = sum(1 for ch in text if ch.isalnum())
+    if alnum < min_alnum:
+        return False
+
+    clean = sum(1 for ch in text if _is_clean_char(ch))
+    return clean / len(text) >= min_clean_ratio
+
+
+def _line_phrases(words, gap_ratio=PHRASE_GAP_RATIO):
+    phrases = []
+    current = []
+    for word in words:
+        if current:
+            prev = current[-1]
+            height = max(prev["yMax"] - prev["yMin"], word["yMax"] - word["yMin"])
+            if word["xMin"] - prev["xMax"] > height * gap_ratio:
+                phrases.append(current)
+                current = []
+        current.append(word)
+    if current:
+        phrases.append(current)
+    return phrases
+
+
+def _phrase_block(words, page_num, scale):
+    x0 = round(min(w["xMin"] for w in words) * scale, 2)
+    y0 = round(min(w["yMin"] for w in words) * scale, 2)
+    x1 = round(max(w["xMax"] for w in words) * scale, 2)
+    y1 = round(max(w["yMax"] for w in words) * scale, 2)
+    return {
+        "text": " ".join(w["text"] for w in words),
+        "confidence": 1.0,
+        "bbox": [[x0, y0], [x1, y0], [x1, y1], [x0, y1]],
+        "page": page_num,
+    }
+
+
+def _reading_order(blocks, y_tol=10):
+    # Same ordering PaddleOCR applies to detected boxes: top-to-bottom, then
+    # left-to-right for boxes whose tops are within `y_tol` pixels.
+    blocks = sorted(blocks, key=lambda b: (b["bbox"][0][1], b["bbox"][0][0]))
+    for i in range(len(blocks) - 1):
+        for j in range(i, -1, -1):
+            a, b = blocks[j]["bbox"][0], blocks[j + 1]["bbox"][0]
+            if abs(b[1] - a[1]) < y_tol and b[0] < a[0]:
+                blocks[j], blocks[j + 1] = blocks[j + 1], blocks[j]
+            else:
+                break
+    return blocks
+
+
+def _parse_bbox_layout(xml_text, dpi):
+    scale = dpi / PDF_POINTS_PER_INCH
+    root = ET.fromstring(xml_text)
+    pages = []
+
+    for page_el in root.iter():
+        if _local_name(page_el.tag) != "page":
+            continue
+        page_num = len(pages) + 1
+        blocks = []
+        for line_el in page_el.iter():
+            if _local_name(line_el.tag) != "line":
+                continue
+            words = []
+            for word_el in line_el:
+                if _local_name(word_el.tag) != "word":
+                    continue
+                text = (word_el.text or "").strip()
+                if not text:
+                    continue
+                words.append({
+                    "text": text,
+                    "xMin": float(word_el.get("xMin")),
+                    "yMin": float(word_el.get("yMin")),
+                    "xMax": float(word_el.get("xMax")),
+                    "yMax": float(word_el.get("yMax")),
+                })
+            words.sort(key=lambda w: w["xMin"])
+            for phrase in _line_phrases(words):
+                blocks.append(_phrase_block(phrase, page_num, scale))
+        pages.append(_reading_order(blocks))
+
+    return pages
+
+
+def extract_text_layer(pdf_path, dpi=RENDER_DPI):
+    """
+    Read the embedded text layer of a PDF as OCR-shaped blocks.
+
+    Blocks follow the `run_ocr` shape: 4-point bbox in `dpi` pixel space
+    and confidence 1.0. Pages whose layer is missing or garbage map to None
+    so the caller can OCR them instead.
+
+    Returns:
+        dict[int, list[dict] | None]: 1-based page number to blocks, or an
+        empty dict when pdftotext is unavailable or fails
+    """
+    executable = _pdftotext_executable()
+    if not executable:
+        return {}
+
+    try:
+        proc = subprocess.run(
+            [executable, "-bbox-layout", "-enc", "UTF-8", str(pdf_path), "-"],
+            capture_output=True,
+            check=True,
+        )
+        pages = _parse_bbox_layout(proc.stdout.decode("utf-8", errors="replace"), dpi)
+    except (OSError, subprocess.CalledProcessError, ET.ParseError):
+        return {}
+
+    layer = {}
+    for page_num, blocks in enumerate(pages, start=1):
+        text = " ".join(b["text"] for b in blocks)
+        layer[page_num] = blocks if is_usable_text(text) else None
+    return layer
@@ -1,50 +1,149 @@
 import time
 from pathlib import Path
-from invoice_ocr.ocr.pipeline_pdf import run_ocr
-from invoice_ocr.table.pipeline_tables import process_pages, apply_schema
-from invoice_ocr.schema.universal import build_universal_invoice
-from invoice_ocr.universal_engine import build_universal_document_output
-from invoice_ocr.validation.validator import validate_document
-from invoice_ocr.risk.assessor import assess_risk
+from invoice_ocr.ocr.pipeline_pdf import run_ocr_many
+from invoice_ocr.stages import DocumentStages
+from invoice_ocr.universal_engine import (
+    build_universal_document_output,
+    output_sections,
+    project_output,
+)
 
 
-def run_pipeline(input_path, enable_deskew=True):
-    start = time.time()
-    input_path = Path(input_path)
+def run_pipeline(input_path, **kwargs):
+    """
+    Full pipeline for one document; see `run_pipeline_many` for options.
+    """
+    return next(run_pipeline_many([input_path], **kwargs))
 
+
+def run_pipeline_many(
+    input_paths,
+    enable_deskew=True,
+    ocr_workers=1,
+    save_page_images=False,
+    page_image_dir=None,
+    page_window=4,
+    use_text_layer=False,
+    ocr_cache=None,
+    rec_batch_size=0,
+    low_dpi=None,
+    deskew_method="min_area_rect",
+    deskew_precheck=False,
+    legacy_universal=True,
+    output_profile="full",
+    fields=None,
+):
+    """
+    Full pipeline over several documents, yielding outputs in input order.
+
+    Phase 1–2 runs as one page stream across documents (shared workers and
+    recognition batches); phase 3–6 runs per document as soon as its last
+    page is OCR'd.
+    """
     # Phase 1–2: OCR
-    ocr_result = run_ocr(input_path, enable_deskew=enable_deskew)
-
-    # Phase 3–4: Tables + schema
-    tables = process_pages(ocr_result["pages"])
-    table = {
-        "columns": list(tables[0].keys()) if tables else [],
-        "rows": tables
-    }
-    table_out = apply_schema(table)
-
-    # Phase 5: Validation
-    validation = validate_document(
-        table_out["schema"],
-        table_out["rows"],
-        ocr_result["blocks"]
+    for _, ocr_result, start in run_ocr_many(
+        (Path(p) for p in input_paths),
+        enable_deskew=enable_deskew,
+        workers=ocr_workers,
+        save_page_images=save_page_images,
+        page_image_dir=page_image_dir,
+        page_window=page_window,
+        use_text_layer=use_text_layer,
+        ocr_cache=ocr_cache,
+        rec_batch_size=rec_batch_size,
+        low_dpi=low_dpi,
+        deskew_method=deskew_method,
+        deskew_precheck=deskew_precheck,
+    ):
+        yield run_post_ocr(
+            ocr_result,
+            start=start,
+            legacy_universal=legacy_universal,
+            output_profile=output_profile,
+            fields=fields,
+        )
+
+
+def _requested(fields, path):
+    """
+    True when the `fields` projection (None keeps everything) covers `path`.
+    """
+    if not fields:
+        return True
+    return any(
+        path == f or path.startswith(f + ".") or f.startswith(path + ".")
+        for f in fields
     )
 
-    # Phase 6: Risk
-    risk = assess_risk(validation, ocr_result["blocks"])
-    universal = build_universal_invoice(
-        table_out["schema"],
-        table_out,
-        validation,
-        ocr_result["blocks"]
+
+def run_post_ocr(
+    ocr_result,
+    start=None,
+    legacy_universal=True,
+    output_profile="full",
+    fields=None,
+):
+    """
+    Phase 3–6 over an existing `run_ocr` result (e.g. reused OCR blocks).
+
+    The universal invoice is built once and serves both the normalized
+    output and, unless `legacy_universal` is False, `meta.legacy_universal`.
+    `output_profile` and `fields` (see `output_sections`) choose the output
+    sections; the stages of `DocumentStages` (field confidence, risk, the
+    universal invoice, ...) run only when a requested section needs them.
+    """
+    if start is None:
+        start = time.time()
+    sections = output_sections(output_profile, fields)
+    detailed = output_profile in ("full", "debug")
+    legacy_universal = (
+        legacy_universal and detailed and _requested(fields, "meta.legacy_universal")
     )
+    validation_raw = detailed and _requested(fields, "validation.raw")
+    need_universal = legacy_universal or bool(
+        sections & {"normalized", "variant_data", "extracted_content"}
+    )
+    need_confidence = (
+        legacy_universal
+        or bool(sections & {"confidence", "extracted_content"})
+        or ("validation" in sections and validation_raw)
+    )
+    need_validation = need_universal or need_confidence or bool(
+        sections & {"validation", "risk", "unknown_fields"}
+    )
+
+    # Stages run on demand: each requested product pulls in only what it
+    # depends on, and every stage runs at most once for the document.
+    stages = DocumentStages(ocr_result, with_confidence=need_confidence)
+    table_out = stages["schema"]
+    validation = stages["validation"] if need_validation else {}
+    risk = stages["risk"] if "risk" in sections else None
+    universal = stages["universal"] if need_universal else None
 
     end = time.time()
-    out = build_universal_document_output(ocr_result, table_out, validation, risk)
+    output_start = time.perf_counter()
+    out = build_universal_document_output(
+        ocr_result,
+        table_out,
+        validation,
+        risk,
+        index=stages["index"],
+        universal=universal,
+        sections=sections,
+        validation_raw=validation_raw,
+    )
+    output_ms = round((time.perf_counter() - output_start) * 1000, 1)
     out["meta"]["processing_time_ms"] = int((end - start) * 1000)
     preprocess = ocr_result.get("preprocess", {})
     if isinstance(preprocess, dict):
         preprocess["version"] = out["meta"].get("preprocess", {}).get("version", "1.0.0")
     out["meta"]["preprocess"] = preprocess
-    out["meta"]["legacy_universal"] = universal
+    if "cache" in ocr_result:
+        out["meta"]["ocr_cache"] = ocr_result["cache"]
+    if legacy_universal:
+        out["meta"]["legacy_universal"] = universal
+    if output_profile == "debug":
+        out["meta"]["timings_ms"] = {**stages.timings_ms, "output": output_ms}
+    if fields:
+        out = project_output(out, fields)
     return out
@@ -52,17 +52,99 @@ def _estimate_angle_min_area_rect(image: np.ndarray) -> float:
     return float(angle)
 
 
-def deskew_image(
+def _estimate_angle_projection(
     image: np.ndarray,
+    max_abs_angle: float = 15.0,
+    max_side: int = 1000,
+) -> float:
+    """
+    Skew angle from horizontal projection profiles of a downscaled page.
+
+    Foreground pixels of a thumbnail (longest side `max_side`) are projected
+    onto the rotated y axis for each candidate angle; text lines line up, and
+    the profile is sharpest, at the page's skew. A 1 degree sweep is refined
+    to 0.1 degree around the best candidate.
+    """
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+    h, w = gray.shape[:2]
+    scale = min(1.0, max_side / float(max(h, w)))
+    if scale < 1.0:
+        gray = cv2.resize(gray, (int(w * scale), int(h * scale)), interpolation=cv2.INTER_AREA)
+
+    _, bw = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV | cv2.THRESH_OTSU)
+    ys, xs = np.nonzero(bw)
+    if ys.size == 0:
+        return 0.0
+
+    xs = xs.astype(np.float32) - bw.shape[1] / 2.0
+    ys = ys.astype(np.float32)
+    offset = float(np.hypot(*bw.shape))
+
+    def sharpness(angle):
+        theta = np.deg2rad(angle)
+        rows = (ys * np.cos(theta) + xs * np.sin(theta) + offset).astype(np.int32)
+        profile = np.bincount(rows).astype(np.float64)
+        return float(np.sum(np.diff(profile) ** 2))
+
+    limit = max_abs_angle + 1.0
+    coarse = np.arange(-limit, limit + 0.5, 1.0)
+    best = max(coarse, key=sharpness)
+    fine = np.arange(best - 1.0, best + 1.05, 0.1)
+    return float(round(max(fine, key=sharpness), 2))
+
+
+DESKEW_METHODS = ("min_area_rect", "projection", "detector")
+
+
+def estimate_angle_from_boxes(boxes, min_width: float = 40.0) -> float | None:
+    """
+    Skew angle from text-line quads, e.g. PaddleOCR detection boxes.
+
+    Each quad is `[top_left, top_right, bottom_right, bottom_left]`. The
+    width-weighted median slope of the top edges is returned, in the same
+    sign convention as the image estimators; None when no box is wide
+    enough to measure.
+    """
+    slopes = []
+    for box in boxes:
+        (x0, y0), (x1, y1) = box[0], box[1]
+        width = float(x1 - x0)
+        if width < min_width:
+            continue
+        slopes.append((float(np.degrees(np.arctan2(y0 - y1, width))), width))
+
+    if not slopes:
+        return None
+
+    slopes.sort()
+    half = sum(width for _, width in slopes) / 2.0
+    seen = 0.0
+    for angle, width in slopes:
+        seen += width
+        if seen >= half:
+            return angle
+    return slopes[-1][0]
+
+
+def correct_skew(
+    image: np.ndarray,
+    angle: float,
+    method: str,
     min_abs_angle: float = 0.7,
     max_abs_angle: float = 15.0,
 ) -> tuple[np.ndarray, dict]:
-    angle = _estimate_angle_min_area_rect(image)
+    """
+    Rotates `image` to undo a detected skew of `angle` degrees.
+
+    Angles below `min_abs_angle` are left alone (no new page is allocated),
+    as are angles above `max_abs_angle`, which are more likely mis-detections
+    than real scan skew.
+    """
     meta = {
         "applied": False,
         "detected_angle_deg": round(angle, 4),
         "applied_angle_deg": 0.0,
-        "method": "min_area_rect",
+        "method": method,
         "min_abs_angle_deg": min_abs_angle,
         "max_abs_angle_deg": max_abs_angle,
     }
@@ -70,7 +152,42 @@ def deskew_image(
     if abs(angle) < min_abs_angle or abs(angle) > max_abs_angle:
         return image, meta
 
-    corrected = _rotate_bound(image, angle)
+    corrected = _rotate_bound(image, -angle)
     meta["applied"] = True
     meta["applied_angle_deg"] = round(angle, 4)
     return corrected, meta
+
+
+def deskew_image(
+    image: np.ndarray,
+    min_abs_angle: float = 0.7,
+    max_abs_angle: float = 15.0,
+    method: str = "min_area_rect",
+    precheck: bool = False,
+) -> tuple[np.ndarray, dict]:
+    """
+    Estimates page skew with `method` and corrects it.
+
+    With `precheck`, the cheap projection estimate runs first and pages it
+    finds clearly straight (under half of `min_abs_angle`) skip the full
+    `min_area_rect` pass. The "detector" method is not estimated here:
+    callers take the angle from OCR detection boxes and apply it with
+    `correct_skew`.
+    """
+    if method == "detector":
+        raise ValueError("The detector deskew method is applied with correct_skew after text detection")
+    if method not in DESKEW_METHODS:
+        raise ValueError(f"Unknown deskew method: {method!r}")
+
+    if precheck and method == "min_area_rect":
+        angle = _estimate_angle_projection(image, max_abs_angle=max_abs_angle)
+        if abs(angle) < min_abs_angle / 2.0:
+            image, meta = correct_skew(image, angle, "precheck", min_abs_angle, max_abs_angle)
+            meta["skipped"] = True
+            return image, meta
+
+    if method == "projection":
+        angle = _estimate_angle_projection(image, max_abs_angle=max_abs_angle)
+    else:
+        angle = _estimate_angle_min_area_rect(image)
+    return correct_skew(image, angle, method, min_abs_angle, max_abs_angle)
@@ -1,7 +1,9 @@
 import re
 from datetime import datetime
 
-from invoice_ocr.table.geometry import center_x, center_y, y_close
+from invoice_ocr.document.block import normalize_space
+from invoice_ocr.document.block_index import BlockIndex
+from invoice_ocr.table.geometry import y_close
 
 
 GSTIN_RE = re.compile(r"\b[0-9]{2}[A-Z]{5}[0-9]{4}[A-Z][A-Z0-9]Z[A-Z0-9]\b")
@@ -12,13 +14,11 @@ CITY_STATE_POSTAL_RE = re.compile(r"^\s*(.*?)[,\s]+([A-Za-z]{2,})\s+(\d{4,10})\s
 ACC_RE = re.compile(r"(?:acc(?:ount)?\s*#?\s*)([0-9 ]{6,})", re.IGNORECASE)
 BSB_RE = re.compile(r"(?:bsb\s*#?\s*)([0-9 ]{6,})", re.IGNORECASE)
 
-
-def _norm(text):
-    return re.sub(r"\s+", " ", (text or "").strip())
+SCHEMA_VERSION = "1.1.0"
 
 
-def _norm_lower(text):
-    return _norm(text).lower()
+def _norm(text):
+    return normalize_space(text)
 
 
 def _sanitize_email(text):
@@ -41,8 +41,8 @@ def _to_decimal_str(text):
     return s
 
 
-def _detect_currency(blocks):
-    text = " ".join(_norm(b.get("text")) for b in blocks)
+def _detect_currency(corpus):
+    text = corpus.normalized
     has_usd = "$" in text
     has_eur = "€" in text
     has_gbp = "£" in text
@@ -55,8 +55,8 @@ def _detect_currency(blocks):
     return None
 
 
-def _extract_payment_terms_days(blocks):
-    text = " ".join(_norm(b.get("text")) for b in blocks).lower()
+def _extract_payment_terms_days(corpus):
+    text = corpus.normalized_lower
     m = re.search(r"due\s+within\s+(\d+)\s+days", text)
     if m:
         try:
@@ -79,7 +79,7 @@ def _was_email_normalized(email, blocks):
     )
     compact = f"{local}@{domain}"
     for b in blocks:
-        t = _norm(b.get("text"))
+        t = b.norm
         if not t:
             continue
         if patt.search(t) and compact not in t:
@@ -89,14 +89,14 @@ def _was_email_normalized(email, blocks):
 
 def _extract_document_title(blocks):
     for b in blocks:
-        t = _norm(b.get("text"))
+        t = b.norm
         if t.lower() in ("invoice", "utility bill", "statement", "receipt"):
             return t
     return None
 
 
 def _extract_label_map(blocks):
-    lower = {_norm_lower(b.get("text")) for b in blocks}
+    lower = {b.norm_lower for b in blocks}
     label_map = {}
     if "from:" in lower:
         label_map["seller"] = "From"
@@ -129,15 +129,15 @@ def _normalize_date_text(text):
 
 def _extract_header_invoice_number(blocks):
     for b in blocks:
-        t = _norm(b.get("text"))
+        t = b.norm
         m = re.fullmatch(r"#\s*([A-Za-z0-9-]+)", t)
         if m:
             return m.group(1)
     return None
 
 
-def _extract_issue_date(blocks):
-    v = _find_value_right_of_label(blocks, ["date:", "date"])
+def _extract_issue_date(blocks, index=None):
+    v = _find_value_right_of_label(blocks, ["date:", "date"], index=index)
     return _normalize_date_text(v) if v else None
 
 
@@ -148,26 +148,26 @@ def _clean_address_line(text):
     return t
 
 
-def _find_value_right_of_label(blocks, label_keywords, y_tol=20):
+def _find_value_right_of_label(blocks, label_keywords, y_tol=20, index=None):
+    if index is None:
+        index = BlockIndex(blocks)
     labels = [
-        b for b in blocks
-        if any(k in _norm_lower(b.get("text")) for k in label_keywords)
+        b for b in index.blocks
+        if any(k in b.norm_lower for k in label_keywords)
     ]
     for label in labels:
-        ly = center_y(label["bbox"])
-        lx = center_x(label["bbox"])
+        ly = label.cy
+        lx = label.cx
         page = label.get("page")
 
         cands = []
-        for b in blocks:
+        for b in index.band(ly - y_tol, ly + y_tol, page=page):
             if b is label:
                 continue
-            if page is not None and b.get("page") != page:
-                continue
-            by = center_y(b["bbox"])
-            bx = center_x(b["bbox"])
+            by = b.cy
+            bx = b.cx
             if abs(by - ly) <= y_tol and bx > lx:
-                text = _norm(b.get("text"))
+                text = b.norm
                 if text:
                     cands.append((bx - lx, text))
         if cands:
@@ -176,10 +176,10 @@ def _find_value_right_of_label(blocks, label_keywords, y_tol=20):
     return None
 
 
-def _variant_from_context(schema_name, blocks):
-    joined = " ".join((b.get("text", "") for b in blocks)).lower()
+def _variant_from_context(schema_name, corpus):
+    joined = corpus.raw_lower
 
-    if "gst" in joined or GSTIN_RE.search(" ".join((b.get("text", "") for b in blocks))):
+    if "gst" in joined or GSTIN_RE.search(corpus.raw):
         return "gst"
     if "telecom" in joined or "phone bill" in joined or "mobile" in joined:
         return "telecom"
@@ -189,22 +189,22 @@ def _variant_from_context(schema_name, blocks):
 
 
 def _extract_invoice_parties(blocks):
-    from_label = next((b for b in blocks if _norm_lower(b.get("text")) == "from:"), None)
-    to_label = next((b for b in blocks if _norm_lower(b.get("text")) == "to:"), None)
-    bill_to_label = next((b for b in blocks if "bill to:" == _norm_lower(b.get("text"))), None)
+    from_label = next((b for b in blocks if b.norm_lower == "from:"), None)
+    to_label = next((b for b in blocks if b.norm_lower == "to:"), None)
+    bill_to_label = next((b for b in blocks if "bill to:" == b.norm_lower), None)
 
     if not from_label and not to_label and not bill_to_label:
         return {}
 
-    top_y = center_y(from_label["bbox"]) if from_label else None
-    to_y = center_y(to_label["bbox"]) if to_label else None
+    top_y = from_label.cy if from_label else None
+    to_y = to_label.cy if to_label else None
     page = (from_label or to_label or bill_to_label).get("page")
 
     left_blocks = [
         b for b in blocks
-        if b.get("page") == page and center_x(b["bbox"]) < 1200
+        if b.get("page") == page and b.cx < 1200
     ]
-    left_blocks.sort(key=lambda b: (center_y(b["bbox"]), center_x(b["bbox"])))
+    left_blocks.sort(key=lambda b: (b.cy, b.cx))
 
     vendor_lines = []
     buyer_lines = []
@@ -212,28 +212,28 @@ def _extract_invoice_parties(blocks):
     if top_y is not None:
         end_y = to_y if to_y is not None else top_y + 500
         for b in left_blocks:
-            y = center_y(b["bbox"])
+            y = b.cy
             if y <= top_y:
                 continue
             if y >= end_y:
                 continue
-            t = _norm(b.get("text"))
+            t = b.norm
             if not t:
                 continue
             vendor_lines.append(t)
 
     if to_y is not None:
         stop_y = to_y + 380
-        table_header = next((b for b in left_blocks if _norm_lower(b.get("text")) in ("hrs/qty", "service")), None)
+        table_header = next((b for b in left_blocks if b.norm_lower in ("hrs/qty", "service")), None)
         if table_header is not None:
-            stop_y = min(stop_y, center_y(table_header["bbox"]) - 20)
+            stop_y = min(stop_y, table_header.cy - 20)
         for b in left_blocks:
-            y = center_y(b["bbox"])
+            y = b.cy
             if y <= to_y:
                 continue
             if y >= stop_y:
                 continue
-            t = _norm(b.get("text"))
+            t = b.norm
             if not t:
                 continue
             if any(h in t.lower() for h in ("hrs/qty", "service", "rate/price", "sub total", "invoice date", "due date")):
@@ -242,12 +242,12 @@ def _extract_invoice_parties(blocks):
 
     # Fallback for invoice layouts with "Bill To:" and no explicit From/To pair.
     if not vendor_lines and bill_to_label is not None:
-        by = center_y(bill_to_label["bbox"])
+        by = bill_to_label.cy
         # Seller name: highest left/top title-like text before Bill To.
         seller_candidates = []
         for b in left_blocks:
-            t = _norm(b.get("text"))
-            y = center_y(b["bbox"])
+            t = b.norm
+            y = b.cy
             if not t:
                 continue
             if y >= by:
@@ -260,13 +260,13 @@ def _extract_invoice_parties(blocks):
             vendor_lines = [seller_candidates[0][1]]
 
         # Buyer lines: right below Bill To until table section starts.
-        item_header = next((b for b in blocks if _norm_lower(b.get("text")) == "item"), None)
-        stop_y = center_y(item_header["bbox"]) - 20 if item_header is not None else by + 420
+        item_header = next((b for b in blocks if b.norm_lower == "item"), None)
+        stop_y = item_header.cy - 20 if item_header is not None else by + 420
         for b in left_blocks:
-            y = center_y(b["bbox"])
+            y = b.cy
             if y <= by or y >= stop_y:
                 continue
-            t = _norm(b.get("text"))
+            t = b.norm
             if not t:
                 continue
             if any(k in t.lower() for k in ("ship to:", "ship mode:", "second class")):
@@ -334,7 +334,7 @@ def _extract_invoice_parties(blocks):
 def _extract_invoice_line_items(blocks):
     headers = {}
     for b in blocks:
-        t = _norm_lower(b.get("text"))
+        t = b.norm_lower
         if t in ("hrs/qty", "service", "rate/price", "adjust", "sub total"):
             headers[t] = b
 
@@ -342,32 +342,32 @@ def _extract_invoice_line_items(blocks):
     if not all(k in headers for k in required):
         return []
 
-    hy = center_y(headers["service"]["bbox"])
-    x_qty = center_x(headers["hrs/qty"]["bbox"])
-    x_service = center_x(headers["service"]["bbox"])
-    x_rate = center_x(headers["rate/price"]["bbox"])
-    x_adjust = center_x(headers["adjust"]["bbox"])
-    x_subtotal = center_x(headers["sub total"]["bbox"])
+    hy = headers["service"].cy
+    x_qty = headers["hrs/qty"].cx
+    x_service = headers["service"].cx
+    x_rate = headers["rate/price"].cx
+    x_adjust = headers["adjust"].cx
+    x_subtotal = headers["sub total"].cx
     page = headers["service"].get("page")
 
     summary_start = None
     for b in blocks:
         if b.get("page") != page:
             continue
-        t = _norm_lower(b.get("text"))
-        if t == "sub total" and center_y(b["bbox"]) > hy + 80 and center_x(b["bbox"]) > x_rate:
-            summary_start = center_y(b["bbox"])
+        t = b.norm_lower
+        if t == "sub total" and b.cy > hy + 80 and b.cx > x_rate:
+            summary_start = b.cy
             break
     if summary_start is None:
         summary_start = hy + 600
 
     row_blocks = [
         b for b in blocks
-        if b.get("page") == page and (hy + 35) <= center_y(b["bbox"]) <= (summary_start - 20)
+        if b.get("page") == page and (hy + 35) <= b.cy <= (summary_start - 20)
     ]
     rows = []
     for b in row_blocks:
-        y = center_y(b["bbox"])
+        y = b.cy
         placed = False
         for r in rows:
             if y_close(y, r["y"], tolerance=24):
@@ -382,8 +382,8 @@ def _extract_invoice_line_items(blocks):
     for r in rows:
         rec = {}
         for b in r["blocks"]:
-            x = center_x(b["bbox"])
-            t = _norm(b.get("text"))
+            x = b.cx
+            t = b.norm
             if not t:
                 continue
             if abs(x - x_qty) < 120:
@@ -424,7 +424,7 @@ def _extract_invoice_line_items(blocks):
 def _extract_product_line_items(blocks):
     headers = {}
     for b in blocks:
-        t = _norm_lower(b.get("text"))
+        t = b.norm_lower
         if t in ("item", "quantity", "rate", "amount"):
             headers[t] = b
 
@@ -433,11 +433,11 @@ def _extract_product_line_items(blocks):
         return []
 
     page = headers["item"].get("page")
-    hy = center_y(headers["item"]["bbox"])
-    x_item = center_x(headers["item"]["bbox"])
-    x_qty = center_x(headers["quantity"]["bbox"])
-    x_rate = center_x(headers["rate"]["bbox"])
-    x_amount = center_x(headers["amount"]["bbox"])
+    hy = headers["item"].cy
+    x_item = headers["item"].cx
+    x_qty = headers["quantity"].cx
+    x_rate = headers["rate"].cx
+    x_amount = headers["amount"].cx
     item_right = (x_item + x_qty) / 2
     qty_right = (x_qty + x_rate) / 2
     rate_right = (x_rate + x_amount) / 2
@@ -446,20 +446,20 @@ def _extract_product_line_items(blocks):
     for b in blocks:
         if b.get("page") != page:
             continue
-        t = _norm_lower(b.get("text"))
+        t = b.norm_lower
         if t in ("subtotal:", "subtotal"):
-            summary_start = center_y(b["bbox"])
+            summary_start = b.cy
             break
     if summary_start is None:
         summary_start = hy + 700
 
     row_blocks = [
         b for b in blocks
-        if b.get("page") == page and (hy + 25) <= center_y(b["bbox"]) <= (summary_start - 15)
+        if b.get("page") == page and (hy + 25) <= b.cy <= (summary_start - 15)
     ]
     rows = []
     for b in row_blocks:
-        y = center_y(b["bbox"])
+        y = b.cy
         placed = False
         for r in rows:
             if y_close(y, r["y"], tolerance=22):
@@ -474,8 +474,8 @@ def _extract_product_line_items(blocks):
     for r in rows:
         rec = {}
         for b in r["blocks"]:
-            x = center_x(b["bbox"])
-            t = _norm(b.get("text"))
+            x = b.cx
+            t = b.norm
             if not t:
                 continue
             if x <= item_right:
@@ -509,7 +509,7 @@ def _extract_product_line_items(blocks):
 
 def _extract_payment_status(blocks):
     for b in blocks:
-        t = _norm_lower(b.get("text"))
+        t = b.norm_lower
         if t == "paid":
             return "paid"
         if re.search(r"\bpayment\s*status\b.*\bpaid\b", t):
@@ -529,35 +529,35 @@ def _extract_payment_details(blocks):
     bsb_text = None
 
     for b in blocks:
-        text = _norm(b.get("text"))
+        text = b.norm
         if not text:
             continue
 
         m_acc = ACC_RE.search(text)
         if m_acc:
             bank["account_number"] = _norm(m_acc.group(1))
-            acc_y = center_y(b["bbox"])
+            acc_y = b.cy
             continue
 
         m_bsb = BSB_RE.search(text)
         if m_bsb:
             bank["bsb"] = _norm(m_bsb.group(1))
-            bsb_y = center_y(b["bbox"])
+            bsb_y = b.cy
             bsb_text = text
             if re.search(r"\bpaid\b", text.lower()):
                 status = "paid"
 
     if acc_y is not None:
-        page = next((b.get("page") for b in blocks if ACC_RE.search(_norm(b.get("text")))), None)
+        page = next((b.get("page") for b in blocks if ACC_RE.search(b.norm)), None)
         cands = []
         for b in blocks:
             if page is not None and b.get("page") != page:
                 continue
-            text = _norm(b.get("text"))
+            text = b.norm
             if not text:
                 continue
-            y = center_y(b["bbox"])
-            x = center_x(b["bbox"])
+            y = b.cy
+            x = b.cx
             if acc_y - 120 <= y <= acc_y and x < 900:
                 if any(k in text.lower() for k in ("acc #", "account #", "bsb #")):
                     continue
@@ -578,8 +578,12 @@ def _extract_payment_details(blocks):
     return out
 
 
-def build_universal_invoice(schema_name, table_out, validation, blocks):
-    variant = _variant_from_context(schema_name, blocks)
+def build_universal_invoice(schema_name, table_out, validation, blocks, index=None):
+    if index is None:
+        index = BlockIndex(blocks)
+    blocks = index.blocks
+    corpus = index.corpus
+    variant = _variant_from_context(schema_name, corpus)
     fields = validation.get("fields", {})
     summary = validation.get("summary", {})
     vendor = validation.get("vendor", {})
@@ -597,26 +601,30 @@ def build_universal_invoice(schema_name, table_out, validation, blocks):
     invoice_id = (
         fields.get("invoice_number")
         or fields.get("account_no")
-        or _find_value_right_of_label(blocks, ["invoice number", "invoice no"])
+        or _find_value_right_of_label(blocks, ["invoice number", "invoice no"], index=index)
         or _extract_header_invoice_number(blocks)
     )
     issue_date = (
         fields.get("invoice_date")
         or fields.get("statement_date")
-        or _find_value_right_of_label(blocks, ["invoice date"])
-        or _extract_issue_date(blocks)
+        or _find_value_right_of_label(blocks, ["invoice date"], index=index)
+        or _extract_issue_date(blocks, index=index)
     )
 
     subtotal = (
         summary.get("subtotal")
         or summary.get("current_charges")
-        or _find_value_right_of_label(blocks, ["sub total"])
+        or _find_value_right_of_label(blocks, ["sub total"], index=index)
+    )
+    order_number = (
+        fields.get("order_number")
+        or _find_value_right_of_label(blocks, ["order number"], index=index)
     )
-    order_number = fields.get("order_number") or _find_value_right_of_label(blocks, ["order number"])
-    currency = _detect_currency(blocks)
+    shipping = _to_decimal_str(_find_value_right_of_label(blocks, ["shipping:", "shipping"], index=index))
+    currency = _detect_currency(corpus)
     document_title = _extract_document_title(blocks)
     label_map = _extract_label_map(blocks)
-    payment_terms_days = _extract_payment_terms_days(blocks)
+    payment_terms_days = _extract_payment_terms_days(corpus)
 
     seller = {
         "name": parties.get("seller", {}).get("name") or vendor.get("name"),
@@ -637,7 +645,7 @@ def build_universal_invoice(schema_name, table_out, validation, blocks):
     }
 
     universal = {
-        "schema_version": "1.1.0",
+        "schema_version": SCHEMA_VERSION,
         "variant": variant,
         "invoice_id": invoice_id,
         "order_number": order_number,
@@ -652,13 +660,13 @@ def build_universal_invoice(schema_name, table_out, validation, blocks):
         "line_items": line_items,
         "totals": {
             "subtotal": _money(subtotal),
-            "shipping": _money(_to_decimal_str(_find_value_right_of_label(blocks, ["shipping:","shipping"]))),
+            "shipping": _money(shipping),
             "tax": _money(summary.get("tax")),
             "total": _money(summary.get("total") or fields.get("total_due")),
             "previous_charges": _money(summary.get("previous_charges")),
             "current_charges": _money(summary.get("current_charges")),
             "subtotal_decimal": float(_to_decimal_str(subtotal)) if _to_decimal_str(subtotal) else None,
-            "shipping_decimal": float(_to_decimal_str(_find_value_right_of_label(blocks, ["shipping:","shipping"]))) if _to_decimal_str(_find_value_right_of_label(blocks, ["shipping:","shipping"])) else None,
+            "shipping_decimal": float(shipping) if shipping else None,
             "tax_decimal": float(_to_decimal_str(summary.get("tax"))) if _to_decimal_str(summary.get("tax")) else None,
             "total_decimal": float(_to_decimal_str(summary.get("total") or fields.get("total_due"))) if _to_decimal_str(summary.get("total") or fields.get("total_due")) else None,
         },
@@ -714,8 +722,7 @@ def build_universal_invoice(schema_name, table_out, validation, blocks):
     ):
         universal["line_items"][0]["line_total"] = _to_decimal_str(universal["totals"]["subtotal"])
 
-    raw_text = " ".join((b.get("text", "") for b in blocks))
-    m = GSTIN_RE.search(raw_text)
+    m = GSTIN_RE.search(corpus.raw)
     if variant == "gst" and m:
         universal["seller"]["tax_id"] = m.group(0)
 
@@ -0,0 +1,234 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures.process import BrokenProcessPool
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+from pdf2image.exceptions import PDFPageCountError, PDFSyntaxError
+
+from invoice_ocr.api import DocumentIntelligenceEngine, OCRConfig
+from invoice_ocr.document_pool import error_record
+from invoice_ocr.utils.json_encoder import DecimalEncoder
+
+# Only PDFs go through the pipeline (rendering starts with `pdfinfo`).
+_PDF_CONTENT_TYPES = {"", "application/pdf", "application/octet-stream"}
+
+# Errors caused by the uploaded document itself; anything else is ours.
+_UNPROCESSABLE = (PDFPageCountError, PDFSyntaxError)
+
+
+class _Metrics:
+    """
+    Request counters shared by the handler threads.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.requests = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def begin(self):
+        with self.lock:
+            self.in_flight += 1
+
+    def end(self, elapsed_ms, ok):
+        with self.lock:
+            self.in_flight -= 1
+            self.requests += 1
+            self.errors += 0 if ok else 1
+            self.total_ms += elapsed_ms
+            self.max_ms = max(self.max_ms, elapsed_ms)
+
+    def snapshot(self):
+        with self.lock:
+            uptime = time.time() - self.started
+            return {
+                "uptime_s": round(uptime, 1),
+                "requests": self.requests,
+                "errors": self.errors,
+                "in_flight": self.in_flight,
+                "documents_per_s": round(self.requests / uptime, 3) if uptime else 0.0,
+                "latency_ms": {
+                    "avg": round(self.total_ms / self.requests, 1) if self.requests else 0.0,
+                    "max": round(self.max_ms, 1),
+                },
+            }
+
+
+class DocumentService:
+    """
+    Processes uploaded documents on one long-lived engine.
+
+    With `document_workers > 1` uploads run on the warm document worker pool;
+    otherwise one at a time in this process, because the PaddleOCR instance
+    is shared.
+    """
+
+    def __init__(self, config=None):
+        self.config = config or OCRConfig()
+        self.engine = DocumentIntelligenceEngine(config=self.config)
+        self.metrics = _Metrics()
+        self._lock = threading.Lock()
+
+    def warm_up(self):
+        if self.config.document_workers > 1:
+            from invoice_ocr.document_pool import warm_document_pool
+
+            warm_document_pool(self.config)
+        else:
+            from invoice_ocr.ocr.run_text_ocr import get_ocr
+
+            get_ocr()
+
+    def process(self, input_path):
+        if self.config.document_workers > 1:
+            from invoice_ocr.document_pool import (
+                process_in_worker,
+                reset_document_pool,
+                submit_document,
+            )
+
+            future = submit_document(self.config, process_in_worker, input_path)
+            try:
+                return future.result()
+            except BrokenProcessPool:
+                # A worker died mid-document; replace the pool so later
+                # uploads (and /health) do not keep seeing it broken.
+                reset_document_pool(self.config)
+                raise
+
+        with self._lock:
+            return self.engine.process(input_path)
+
+    def healthy(self):
+        if self.config.document_workers > 1:
+            from invoice_ocr.document_pool import document_pool_healthy
+
+            return document_pool_healthy(self.config)
+        return True
+
+
+def _error_status(exc):
+    if isinstance(exc, _UNPROCESSABLE):
+        return 422
+    if isinstance(exc, BrokenProcessPool):
+        return 503
+    return 500
+
+
+def _is_pdf_upload(handler, query):
+    name = (query.get("filename") or [handler.headers.get("X-Filename", "")])[0]
+    suffix = Path(name).suffix.lower()
+    if suffix:
+        return suffix == ".pdf"
+    content_type = handler.headers.get("Content-Type", "").split(";")[0].strip().lower()
+    return content_type in _PDF_CONTENT_TYPES
+
+
+def _make_handler(service):
+    class Handler(BaseHTTPRequestHandler):
+        server_version = "invoice-ocr"
+
+        def _send_json(self, status, payload):
+            body = json.dumps(payload, cls=DecimalEncoder).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            path = urlparse(self.path).path
+            if path == "/health":
+                if service.healthy():
+                    self._send_json(200, {"status": "ok"})
+                else:
+                    self._send_json(503, {
+                        "status": "unhealthy",
+                        "reason": "document worker pool is broken",
+                    })
+            elif path == "/metrics":
+                self._send_json(200, service.metrics.snapshot())
+            else:
+                self._send_json(404, {"error": "not found"})
+
+        def do_POST(self):
+            url = urlparse(self.path)
+            if url.path != "/process":
+                self._send_json(404, {"error": "not found"})
+                return
+
+            length = int(self.headers.get("Content-Length") or 0)
+            if length <= 0:
+                self._send_json(400, {"error": "empty upload"})
+                return
+
+            if not _is_pdf_upload(self, parse_qs(url.query)):
+                self._send_json(415, {"error": "only PDF uploads are supported"})
+                return
+
+            fd, tmp = tempfile.mkstemp(suffix=".pdf")
+            start = time.perf_counter()
+            service.metrics.begin()
+            status = 500
+            try:
+                with os.fdopen(fd, "wb") as fh:
+                    remaining = length
+                    while remaining:
+                        chunk = self.rfile.read(min(remaining, 1 << 20))
+                        if not chunk:
+                            break
+                        fh.write(chunk)
+                        remaining -= len(chunk)
+                try:
+                    result = service.process(Path(tmp))
+                    status = 200
+                except Exception as exc:
+                    result = error_record(tmp, exc)
+                    status = _error_status(exc)
+            finally:
+                service.metrics.end((time.perf_counter() - start) * 1000, status == 200)
+                try:
+                    os.remove(tmp)
+                except OSError:
+                    pass
+
+            self._send_json(status, result)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def serve(host="127.0.0.1", port=8000, config=None):
+    """
+    Runs the HTTP server until interrupted.
+
+    Endpoints:
+        POST /process   raw PDF body -> `process_document` JSON; 415 for other
+                        uploads, 422 for unreadable PDFs, 503 if a worker died
+                        (name the upload via `?filename=` or `X-Filename`)
+        GET  /health    200 once models are loaded, 503 while the worker
+                        pool is broken
+        GET  /metrics   request, error, in-flight and latency counters
+    """
+    service = DocumentService(config)
+    service.warm_up()
+
+    httpd = ThreadingHTTPServer((host, port), _make_handler(service))
+    print(f"invoice-ocr serving on http://{host}:{httpd.server_address[1]}", flush=True)
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
@@ -0,0 +1,175 @@
+import time
+
+from invoice_ocr.document.block_index import BlockIndex
+from invoice_ocr.risk.assessor import assess_risk
+from invoice_ocr.schema.universal import build_universal_invoice
+from invoice_ocr.table.pipeline_tables import apply_schema, process_pages
+from invoice_ocr.validation.confidence import extract_confidence_map
+from invoice_ocr.validation.document_extract import extract_document_enrichment
+from invoice_ocr.validation.field_extract import extract_document_fields
+from invoice_ocr.validation.summary_extract import extract_summary
+from invoice_ocr.validation.summary_validate import validate_summary
+from invoice_ocr.validation.validator import (
+    confidence_source,
+    validate_line_items,
+    validation_report,
+)
+
+# name -> (dependencies, function of the DocumentStages)
+STAGES = {}
+
+
+def _stage(name, *deps):
+    def register(fn):
+        STAGES[name] = (deps, fn)
+        return fn
+    return register
+
+
+@_stage("index")
+def _index(stages):
+    # One spatial index per document, shared by every label/neighbour lookup.
+    return BlockIndex(stages.ocr_result["blocks"])
+
+
+@_stage("tables", "index")
+def _tables(stages):
+    # Page blocks come from the index, so each block is a `Block` built once
+    # for the document and shared with every other stage.
+    index = stages["index"]
+    pages = [
+        {**page, "blocks": index.page_blocks(page["page"], reading_order=False)}
+        for page in stages.ocr_result["pages"]
+    ]
+    tables = process_pages(pages)
+    return {
+        "columns": list(tables[0].keys()) if tables else [],
+        "rows": tables
+    }
+
+
+@_stage("schema", "tables")
+def _schema(stages):
+    return apply_schema(stages["tables"])
+
+
+@_stage("line_items", "schema")
+def _line_items(stages):
+    table_out = stages["schema"]
+    return validate_line_items(table_out["schema"], table_out["rows"])
+
+
+@_stage("summary", "index")
+def _summary(stages):
+    index = stages["index"]
+    return extract_summary(index.blocks, index=index)
+
+
+@_stage("fields", "index")
+def _fields(stages):
+    index = stages["index"]
+    return extract_document_fields(index.blocks, index=index)
+
+
+@_stage("enrichment", "index", "fields")
+def _enrichment(stages):
+    index = stages["index"]
+    return extract_document_enrichment(index.blocks, stages["fields"], index=index)
+
+
+@_stage("confidence", "index", "fields", "enrichment", "summary")
+def _confidence(stages):
+    if not stages.with_confidence:
+        return {}
+    index = stages["index"]
+    source = confidence_source(stages["fields"], stages["enrichment"], stages["summary"])
+    return extract_confidence_map(source, index.blocks, index=index)
+
+
+@_stage("summary_checks", "schema", "line_items", "summary")
+def _summary_checks(stages):
+    table_out = stages["schema"]
+    return validate_summary(table_out["schema"], table_out["rows"], stages["summary"])
+
+
+@_stage(
+    "validation",
+    "line_items", "fields", "enrichment", "summary", "confidence", "summary_checks",
+)
+def _validation(stages):
+    return validation_report(
+        stages["line_items"],
+        stages["fields"],
+        stages["enrichment"],
+        stages["summary"],
+        stages["confidence"],
+        stages["summary_checks"],
+    )
+
+
+@_stage("risk", "validation")
+def _risk(stages):
+    return assess_risk(stages["validation"], stages.ocr_result["blocks"])
+
+
+@_stage("universal", "schema", "validation", "index")
+def _universal(stages):
+    table_out = stages["schema"]
+    return build_universal_invoice(
+        table_out["schema"],
+        table_out,
+        stages["validation"],
+        stages.ocr_result["blocks"],
+        index=stages["index"],
+    )
+
+
+class DocumentStages:
+    """
+    Phase 3–6 of one document as a graph of named, lazily evaluated stages.
+
+    `stages["risk"]` runs only the stages risk depends on, each at most
+    once; results are memoized for the document. `invalidate` drops a
+    stage and everything downstream of it, so only affected stages re-run.
+    With `with_confidence=False` the confidence stage yields an empty map
+    without matching values to blocks.
+
+    Attributes:
+        timings_ms (dict): milliseconds spent in each evaluated stage,
+            excluding its dependencies
+    """
+
+    def __init__(self, ocr_result, with_confidence=True):
+        self.ocr_result = ocr_result
+        self.with_confidence = with_confidence
+        self.timings_ms = {}
+        self._results = {}
+
+    def __contains__(self, name):
+        return name in self._results
+
+    def __getitem__(self, name):
+        if name not in self._results:
+            deps, fn = STAGES[name]
+            for dep in deps:
+                self[dep]
+            start = time.perf_counter()
+            self._results[name] = fn(self)
+            self.timings_ms[name] = round((time.perf_counter() - start) * 1000, 1)
+        return self._results[name]
+
+    def invalidate(self, name):
+        """
+        Forgets `name` and every evaluated stage that depends on it.
+        """
+        stale = {name}
+        changed = True
+        while changed:
+            changed = False
+            for stage, (deps, _) in STAGES.items():
+                if stage not in stale and stale.intersection(deps):
+                    stale.add(stage)
+                    changed = True
+        for stage in stale:
+            self._results.pop(stage, None)
+            self.timings_ms.pop(stage, None)
@@ -1,4 +1,10 @@
-from invoice_ocr.table.geometry import center_x
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+
+from invoice_ocr.document.block import as_blocks
+
+ALIGN_TOLERANCE = 20
+
 
 def detect_columns(header_row):
     columns = []
@@ -17,3 +23,46 @@ def detect_columns(header_row):
     # sort left → right
     columns.sort(key=lambda c: c["xmin"])
     return columns
+
+
+class ColumnLayout:
+    """
+    Columns from `detect_columns`, compiled for binary-search lookup.
+
+    `column_at` returns the first column (in xmin order) whose span contains
+    x, exactly like a linear scan: columns starting at or before x form a
+    prefix of the sorted list, and a running max of their xmax finds the
+    first one that also reaches x. The alignment band (spans widened by
+    `tolerance`) is precomputed the same way.
+    """
+
+    def __init__(self, columns, tolerance=ALIGN_TOLERANCE):
+        self.columns = columns
+        self.tolerance = tolerance
+        self._xmins = [c["xmin"] for c in columns]
+        self._reach = list(accumulate((c["xmax"] for c in columns), max))
+        self._band_xmins = [c["xmin"] - tolerance for c in columns]
+        self._band_reach = list(
+            accumulate((c["xmax"] + tolerance for c in columns), max)
+        )
+
+    def column_at(self, x):
+        k = bisect_right(self._xmins, x)
+        j = bisect_left(self._reach, x, 0, k)
+        return self.columns[j] if j < k else None
+
+    def is_aligned(self, x):
+        k = bisect_right(self._band_xmins, x)
+        return k > 0 and self._band_reach[k - 1] >= x
+
+    def assign(self, blocks):
+        """
+        Maps column name -> text for the blocks (`Block`s or plain block
+        dicts) of one row.
+        """
+        record = {}
+        for block in as_blocks(blocks):
+            col = self.column_at(block.cx)
+            if col is not None:
+                record[col["name"]] = block["text"]
+        return record
@@ -1,4 +1,9 @@
+from invoice_ocr.table.columns import ColumnLayout
+
+
 class TableContext:
-    def __init__(self, columns, last_y):
+    def __init__(self, columns, last_y, layout=None):
         self.columns = columns
         self.last_y = last_y
+        # Compiled once per table and reused on every continuation page.
+        self.layout = layout or ColumnLayout(columns)
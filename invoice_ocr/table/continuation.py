@@ -1,9 +1,12 @@
-from invoice_ocr.table.geometry import center_x, center_y
+from invoice_ocr.document.block import as_blocks
+from invoice_ocr.table.columns import ALIGN_TOLERANCE, ColumnLayout
 
-def is_row_aligned_with_columns(row, columns, tolerance=20):
-    for block in row["blocks"]:
-        cx = center_x(block["bbox"])
-        for col in columns:
-            if col["xmin"] - tolerance <= cx <= col["xmax"] + tolerance:
-                return True
-    return False
+def is_row_aligned_with_columns(row, columns, tolerance=ALIGN_TOLERANCE):
+    """
+    `columns` is a `ColumnLayout` (or a `detect_columns` list); the row's
+    blocks are `Block`s (or plain block dicts).
+    """
+    layout = columns
+    if not isinstance(layout, ColumnLayout) or layout.tolerance != tolerance:
+        layout = ColumnLayout(getattr(columns, "columns", columns), tolerance)
+    return any(layout.is_aligned(block.cx) for block in as_blocks(row["blocks"]))
@@ -1,4 +1,5 @@
-from invoice_ocr.table.geometry import center_y, y_close
+from invoice_ocr.table.rows import cluster_rows
+from invoice_ocr.utils.keywords import KeywordMatcher
 
 HEADER_KEYWORDS = [
     "date",
@@ -14,9 +15,10 @@ HEADER_KEYWORDS = [
     "total"
 ]
 
+_HEADER_MATCHER = KeywordMatcher({"header": HEADER_KEYWORDS})
+
 def is_header_text(text):
-    t = text.lower()
-    return any(k in t for k in HEADER_KEYWORDS)
+    return _HEADER_MATCHER.search(text.lower())
 
 def detect_header_row(blocks):
     candidates = []
@@ -26,22 +28,7 @@ def detect_header_row(blocks):
             candidates.append(block)
 
     # group header candidates by Y alignment
-    header_rows = []
-    for block in candidates:
-        placed = False
-        y = center_y(block["bbox"])
-
-        for row in header_rows:
-            if y_close(y, row["y"]):
-                row["blocks"].append(block)
-                placed = True
-                break
-
-        if not placed:
-            header_rows.append({
-                "y": y,
-                "blocks": [block]
-            })
+    header_rows = cluster_rows(candidates)
 
     # pick the row with max header blocks
     if not header_rows:
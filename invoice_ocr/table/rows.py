@@ -1,28 +1,43 @@
-from invoice_ocr.table.geometry import center_y, y_close
+from invoice_ocr.document.block import as_blocks
+from invoice_ocr.table.geometry import y_close
 
-def group_rows(blocks, header_y):
-    rows = []
 
-    for block in blocks:
-        y = center_y(block["bbox"])
+def cluster_rows(blocks, tolerance=15):
+    """
+    Groups blocks into rows by center y with one sort and one sweep.
 
-        # ignore header itself
-        if y_close(y, header_y):
-            continue
+    Blocks are visited top to bottom; a row is anchored at its topmost
+    block and takes every following block within `tolerance` of that
+    anchor. Within a row, blocks keep their input order. The grouping does
+    not depend on the order OCR returned the blocks in.
 
-        placed = False
-        for row in rows:
-            if y_close(y, row["y"]):
-                row["blocks"].append(block)
-                placed = True
-                break
+    Rows are keyed by the precomputed `Block.cy`; plain block dicts are
+    wrapped as `Block` first, so rows then hold the wrapped copies.
 
-        if not placed:
-            rows.append({
-                "y": y,
-                "blocks": [block]
-            })
+    Returns:
+        list[dict]: `{"y": anchor_y, "blocks": [...]}`, top to bottom
+    """
+    keyed = sorted(
+        ((b.cy, i, b) for i, b in enumerate(as_blocks(blocks))),
+        key=lambda e: (e[0], e[1]),
+    )
+
+    rows = []
+    members = []
+    for y, i, block in keyed:
+        if rows and y - rows[-1]["y"] <= tolerance:
+            members[-1].append((i, block))
+        else:
+            rows.append({"y": y, "blocks": None})
+            members.append([(i, block)])
 
-    # sort top → bottom
-    rows.sort(key=lambda r: r["y"])
+    for row, row_members in zip(rows, members):
+        row_members.sort(key=lambda m: m[0])
+        row["blocks"] = [block for _, block in row_members]
     return rows
+
+
+def group_rows(blocks, header_y):
+    # ignore header itself
+    body = [b for b in as_blocks(blocks) if not y_close(b.cy, header_y)]
+    return cluster_rows(body)
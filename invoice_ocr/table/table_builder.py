@@ -1,42 +1,40 @@
-from invoice_ocr.table.geometry import center_x
+from invoice_ocr.document.block import as_blocks
 from invoice_ocr.table.header_detector import detect_header_row
-from invoice_ocr.table.columns import detect_columns
+from invoice_ocr.table.columns import ColumnLayout, detect_columns
 from invoice_ocr.table.rows import group_rows
 from invoice_ocr.table.context import TableContext
 from invoice_ocr.table.continuation import is_row_aligned_with_columns
 from invoice_ocr.table.row_validator import is_valid_row
 
 def assign_cells_to_columns(row, columns):
-    record = {}
-
-    for block in row["blocks"]:
-        cx = center_x(block["bbox"])
-
-        for col in columns:
-            if col["xmin"] <= cx <= col["xmax"]:
-                record[col["name"]] = block["text"]
-                break
-
-    return record
+    """
+    `columns` is a `ColumnLayout` (or a `detect_columns` list).
+    """
+    layout = columns if isinstance(columns, ColumnLayout) else ColumnLayout(columns)
+    return layout.assign(row["blocks"])
 
 def extract_table(blocks, previous_context=None):
+    # Row and column matching read the centers precomputed on `Block`; the
+    # pipeline already passes the document's `Block`s, which are kept as is.
+    blocks = as_blocks(blocks)
     header = detect_header_row(blocks)
 
     # CASE 1 — New table found
     if header:
         columns = detect_columns(header)
+        layout = ColumnLayout(columns)
         rows = group_rows(blocks, header["y"])
 
         table_rows = []
         last_y = header["y"]
 
         for row in rows:
-            record = assign_cells_to_columns(row, columns)
+            record = assign_cells_to_columns(row, layout)
             if len(record) >= 2:
                 table_rows.append(record)
                 last_y = row["y"]
 
-        context = TableContext(columns, last_y)
+        context = TableContext(columns, last_y, layout=layout)
 
         return {
             "rows": table_rows,
@@ -51,8 +49,8 @@ def extract_table(blocks, previous_context=None):
         last_y = previous_context.last_y
 
         for row in rows:
-            if is_row_aligned_with_columns(row, previous_context.columns):
-                record = assign_cells_to_columns(row, previous_context.columns)
+            if is_row_aligned_with_columns(row, previous_context.layout):
+                record = assign_cells_to_columns(row, previous_context.layout)
                 if is_valid_row(record):
                     continued_rows.append(record)
         if continued_rows:
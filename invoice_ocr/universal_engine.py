@@ -1,12 +1,40 @@
 import re
 from datetime import datetime
 
+from invoice_ocr.document.block import normalize_space
+from invoice_ocr.document.block_index import BlockIndex
 from invoice_ocr.risk.ocr_confidence import average_ocr_confidence
-from invoice_ocr.schema.universal import build_universal_invoice
+from invoice_ocr.schema.universal import SCHEMA_VERSION, build_universal_invoice
+
+ENGINE_VERSION = "2.0.0"
+
+_ALL_SECTIONS = (
+    "document",
+    "extracted_content",
+    "tables",
+    "normalized",
+    "variant_data",
+    "unknown_fields",
+    "validation",
+    "confidence",
+    "risk",
+)
+
+# Top-level output sections per profile; "meta" is always present. "full"
+# and "debug" also keep `validation.raw` and `meta.legacy_universal`, and
+# "debug" adds per-stage `meta.timings_ms`.
+OUTPUT_PROFILES = {
+    "minimal": ("normalized", "risk"),
+    "normalized": (
+        "document", "normalized", "variant_data", "validation", "confidence", "risk",
+    ),
+    "full": _ALL_SECTIONS,
+    "debug": _ALL_SECTIONS,
+}
 
 
 def _norm(text):
-    return re.sub(r"\s+", " ", (text or "").strip())
+    return normalize_space(text)
 
 
 def _slug(text):
@@ -26,20 +54,18 @@ def _avg(values):
     return round(sum(vals) / len(vals), 3)
 
 
-def _detect_languages(blocks):
-    text = " ".join(b.get("text", "") for b in blocks)
-    if not text:
+def _detect_languages(corpus):
+    if not corpus.raw:
         return [{"code": "unknown", "confidence": 0.0}]
 
-    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
-    ratio = ascii_chars / max(len(text), 1)
+    ratio = corpus.ascii_ratio
     if ratio > 0.9:
         return [{"code": "en", "confidence": round(min(1.0, 0.8 + 0.2 * ratio), 3)}]
     return [{"code": "unknown", "confidence": 0.5}]
 
 
-def _classify_document(schema_name, blocks, page_count):
-    joined = " ".join(b.get("text", "") for b in blocks).lower()
+def _classify_document(schema_name, corpus, page_count):
+    joined = corpus.raw_lower
     if schema_name and schema_name != "generic":
         doc_type = schema_name
         conf = 0.95
@@ -74,27 +100,27 @@ def _classify_document(schema_name, blocks, page_count):
         "domain": domain if domain_conf >= 0.7 else "unknown",
         "domain_confidence": round(domain_conf, 3),
         "pages": page_count,
-        "languages": _detect_languages(blocks),
+        "languages": _detect_languages(corpus),
     }
 
 
-def _detect_structure(pages, blocks, table_out, validation, normalized_line_items=None):
+def _detect_structure(pages, index, table_out, validation, normalized_line_items=None):
     headers = []
     footers = []
     repeated = {}
 
     for page in pages:
         pno = page.get("page")
-        pblocks = [b for b in blocks if b.get("page") == pno]
+        pblocks = index.page_blocks(pno, reading_order=False)
         if not pblocks:
             continue
-        ymax = max(max(pt[1] for pt in b["bbox"]) for b in pblocks)
+        ymax = index.page_ymax(pno)
         header_cut = ymax * 0.18
         footer_cut = ymax * 0.82
 
         for b in pblocks:
-            cy = (b["bbox"][0][1] + b["bbox"][2][1]) / 2
-            text = _norm(b.get("text"))
+            cy = b.cy
+            text = b.norm
             if not text:
                 continue
             if cy <= header_cut:
@@ -193,7 +219,7 @@ def _extract_fields_with_context(validation):
 def _discover_unknown_fields(blocks, known_labels):
     unknown = {}
     for b in blocks:
-        text = _norm(b.get("text"))
+        text = b.norm
         if ":" not in text:
             continue
         label, value = text.split(":", 1)
@@ -321,26 +347,8 @@ def _build_variant_data(universal):
     return out
 
 
-def build_universal_document_output(ocr_result, table_out, validation, risk):
-    blocks = ocr_result.get("blocks", [])
-    pages = ocr_result.get("pages", [])
-    schema_name = table_out.get("schema", "unknown")
-
-    universal = build_universal_invoice(schema_name, table_out, validation, blocks)
-    document = _classify_document(schema_name, blocks, len(pages))
-    structure = _detect_structure(
-        pages, blocks, table_out, validation, universal.get("line_items", [])
-    )
-    extracted_fields = _extract_fields_with_context(validation)
-
-    known_labels = set(validation.get("fields", {}).keys())
-    known_labels.update([
-        "phone", "email", "website", "account no", "statement date", "due date",
-        "invoice number", "invoice date", "order number", "total due"
-    ])
-    unknown_fields = _discover_unknown_fields(blocks, known_labels)
-
-    normalized = {
+def _build_normalized(universal):
+    return {
         "seller": universal.get("seller"),
         "buyer": universal.get("buyer"),
         "document_title": universal.get("document_title"),
@@ -362,42 +370,151 @@ def build_universal_document_output(ocr_result, table_out, validation, risk):
         "reminders": (universal.get("metadata") or {}).get("reminders", []),
     }
 
-    extracted_content = {
-        "structure": structure,
-        "fields": extracted_fields,
-        "logical_blocks": [
-            {
-                "page": b.get("page"),
-                "text": _norm(b.get("text")),
-                "confidence": b.get("confidence"),
-            }
-            for b in blocks
-            if _norm(b.get("text"))
-        ],
-    }
 
-    confidence = _build_confidence(validation, blocks)
-    validation_out = _build_validation(validation)
-    variant_data = _build_variant_data(universal)
-    if unknown_fields:
-        variant_data["schema_discovery"] = True
+def output_sections(profile="full", fields=None):
+    """
+    Top-level output sections to build.
+
+    Args:
+        profile (str): key of `OUTPUT_PROFILES`
+        fields (Iterable[str] | None): dotted output paths to keep, e.g.
+            `["normalized.totals", "risk"]`; when given, only their top-level
+            sections are built
+
+    Returns:
+        set[str]: section names, excluding the always-present "meta"
+    """
+    if profile not in OUTPUT_PROFILES:
+        raise ValueError(f"Unknown output profile: {profile!r}")
+    if not fields:
+        return set(OUTPUT_PROFILES[profile])
+
+    sections = {path.split(".", 1)[0] for path in fields} - {"meta"}
+    unknown = sections - set(_ALL_SECTIONS)
+    if unknown:
+        raise ValueError(f"Unknown output sections: {sorted(unknown)}")
+    return sections
+
+
+def project_output(out, fields):
+    """
+    Copy of `out` holding only the dotted `fields` paths (plus "meta").
+
+    Paths missing from `out` are skipped; list values are kept whole.
+    """
+    missing = object()
+    projected = {}
+    for path in fields:
+        keys = path.split(".")
+        value = out
+        for key in keys:
+            value = value.get(key, missing) if isinstance(value, dict) else missing
+            if value is missing:
+                break
+        if value is missing:
+            continue
 
-    return {
-        "document": document,
-        "extracted_content": extracted_content,
-        "tables": [table_out],
-        "normalized": normalized,
-        "variant_data": variant_data,
-        "unknown_fields": unknown_fields,
-        "validation": validation_out,
-        "confidence": confidence,
-        "risk": risk,
-        "meta": {
-            "engine_version": "2.0.0",
-            "schema_version": universal.get("schema_version", "1.1.0"),
-            "ocr_engine": "PaddleOCR",
-            "preprocess": {
-                "version": "1.0.0",
-            },
+        dst = projected
+        for key in keys[:-1]:
+            dst = dst.setdefault(key, {})
+        dst[keys[-1]] = value
+    projected["meta"] = out["meta"]
+    return projected
+
+
+def build_universal_document_output(
+    ocr_result,
+    table_out,
+    validation,
+    risk,
+    index=None,
+    universal=None,
+    sections=None,
+    validation_raw=True,
+):
+    """
+    Assembles the versioned output document.
+
+    Only the top-level `sections` (default: all) are built, so stages
+    behind unrequested sections never run; `validation_raw=False` leaves
+    the copy of the validation report out of `validation`.
+    """
+    blocks = ocr_result.get("blocks", [])
+    pages = ocr_result.get("pages", [])
+    schema_name = table_out.get("schema", "unknown")
+    if sections is None:
+        sections = set(_ALL_SECTIONS)
+    if index is None:
+        index = BlockIndex(blocks)
+    blocks = index.blocks
+
+    if universal is None and sections & {"normalized", "variant_data", "extracted_content"}:
+        universal = build_universal_invoice(schema_name, table_out, validation, blocks, index=index)
+
+    out = {}
+    if "document" in sections:
+        out["document"] = _classify_document(schema_name, index.corpus, len(pages))
+
+    if "extracted_content" in sections:
+        structure = _detect_structure(
+            pages, index, table_out, validation, universal.get("line_items", [])
+        )
+        out["extracted_content"] = {
+            "structure": structure,
+            "fields": _extract_fields_with_context(validation),
+            "logical_blocks": [
+                {
+                    "page": b.get("page"),
+                    "text": b.norm,
+                    "confidence": b.get("confidence"),
+                }
+                for b in blocks
+                if b.norm
+            ],
+        }
+
+    if "tables" in sections:
+        out["tables"] = [table_out]
+
+    unknown_fields = None
+    if sections & {"unknown_fields", "variant_data"}:
+        known_labels = set(validation.get("fields", {}).keys())
+        known_labels.update([
+            "phone", "email", "website", "account no", "statement date", "due date",
+            "invoice number", "invoice date", "order number", "total due"
+        ])
+        unknown_fields = _discover_unknown_fields(blocks, known_labels)
+
+    if "normalized" in sections:
+        out["normalized"] = _build_normalized(universal)
+
+    if "variant_data" in sections:
+        variant_data = _build_variant_data(universal)
+        if unknown_fields:
+            variant_data["schema_discovery"] = True
+        out["variant_data"] = variant_data
+
+    if "unknown_fields" in sections:
+        out["unknown_fields"] = unknown_fields
+
+    if "validation" in sections:
+        validation_out = _build_validation(validation)
+        if not validation_raw:
+            del validation_out["raw"]
+        out["validation"] = validation_out
+
+    if "confidence" in sections:
+        out["confidence"] = _build_confidence(validation, blocks)
+
+    if "risk" in sections:
+        out["risk"] = risk
+
+    out["meta"] = {
+        "engine_version": ENGINE_VERSION,
+        "schema_version": (universal or {}).get("schema_version", SCHEMA_VERSION),
+        "ocr_engine": "PaddleOCR",
+        "preprocess": {
+            "version": "1.0.0",
         },
     }
+    return out
@@ -0,0 +1,149 @@
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+from pathlib import Path
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_key(*parts):
+    """
+    Stable hex key over JSON-serializable parts.
+    """
+    payload = json.dumps(parts, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class DiskCache:
+    """
+    Size-bounded on-disk pickle store with least-recently-used eviction.
+
+    Entries live at `<directory>/<key[:2]>/<key>.pkl`. Reads touch the file
+    mtime. The total size is scanned on the first write (reads never scan)
+    and then tracked per write; only when it grows past `max_bytes` is the
+    directory re-scanned and the oldest entries evicted, down to `EVICT_TO`
+    of the budget so the next writes do not immediately scan again.
+
+    Use `open_cache` to share one instance per directory within a process.
+    """
+
+    # Fraction of `max_bytes` left after an eviction pass.
+    EVICT_TO = 0.9
+
+    def __init__(self, directory, max_bytes=1 << 30):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._total_bytes = None
+
+    @property
+    def total_bytes(self):
+        """
+        Bytes held by the cache, measured on first use and tracked after.
+        """
+        if self._total_bytes is None:
+            self._total_bytes = sum(size for _, size, _ in self._entries())
+        return self._total_bytes
+
+    def _path(self, key):
+        return self.directory / key[:2] / f"{key}.pkl"
+
+    def _entries(self):
+        entries = []
+        for path in self.directory.glob("*/*.pkl"):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        return entries
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with path.open("rb") as fh:
+                value = pickle.load(fh)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            self.misses += 1
+            return None
+
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        total = self.total_bytes
+        try:
+            replaced = path.stat().st_size
+        except OSError:
+            replaced = 0
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                pickle.dump(value, fh, protocol=pickle.HIGHEST_PROTOCOL)
+                written = fh.tell()
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            raise
+
+        self._total_bytes = total + written - replaced
+        if self._total_bytes > self.max_bytes:
+            self._evict()
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses}
+
+    def _evict(self):
+        # Re-scan rather than trust the running total: other processes may
+        # share the directory.
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * self.EVICT_TO
+
+        entries.sort(key=lambda e: e[0])
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+        self._total_bytes = total
+
+
+_caches = {}
+
+
+def open_cache(directory, max_bytes=1 << 30):
+    """
+    Shared `DiskCache` for `directory` and `max_bytes`.
+
+    Engines built per call (`process_document`, `convert`) reuse the same
+    instance, so the directory is not re-measured for every document and
+    hit/miss counts accumulate for the whole process.
+    """
+    key = (str(Path(directory).resolve()), max_bytes)
+    cache = _caches.get(key)
+    if cache is None:
+        cache = _caches[key] = DiskCache(directory, max_bytes=max_bytes)
+    return cache
@@ -0,0 +1,77 @@
+import re
+from functools import lru_cache
+
+
+class KeywordMatcher:
+    """
+    Finds which keyword groups occur, as substrings, in a piece of text.
+
+    All keywords are compiled into one regex of zero-width lookaheads, longest
+    alternative first, so a single scan reports the longest keyword starting
+    at every position. Shorter keywords that are prefixes of a reported one
+    start at the same position and are added from a precomputed table; the
+    result is the same as testing `keyword in text` for every keyword.
+
+    Matching is case-sensitive; callers pass lower-cased text, as the
+    keyword tables are lower case.
+    """
+
+    def __init__(self, groups):
+        self.groups = {name: tuple(keywords) for name, keywords in groups.items()}
+
+        owners = {}
+        for name, keywords in self.groups.items():
+            for keyword in keywords:
+                owners.setdefault(keyword, set()).add(name)
+        owners.pop("", None)
+
+        keywords = sorted(owners, key=lambda k: (-len(k), k))
+        self._any = re.compile("|".join(map(re.escape, keywords))) if keywords else None
+        self._scan = (
+            re.compile("(?=(" + "|".join(map(re.escape, keywords)) + "))")
+            if keywords else None
+        )
+        self._hits = {
+            keyword: frozenset().union(*(owners[k] for k in keywords if keyword.startswith(k)))
+            for keyword in keywords
+        }
+
+    def search(self, text):
+        """
+        True when any keyword occurs in `text`.
+        """
+        return self._any is not None and self._any.search(text) is not None
+
+    def match(self, text):
+        """
+        Names of the groups with at least one keyword in `text`.
+        """
+        if self._scan is None:
+            return frozenset()
+        found = {m.group(1) for m in self._scan.finditer(text)}
+        if not found:
+            return frozenset()
+        return frozenset().union(*(self._hits[k] for k in found))
+
+    def group_blocks(self, blocks, text=lambda b: b["text"].lower()):
+        """
+        Maps each group name to the blocks whose text hits it, in block order,
+        in one pass over `blocks`.
+        """
+        grouped = {name: [] for name in self.groups}
+        for block in blocks:
+            for name in self.match(text(block)):
+                grouped[name].append(block)
+        return grouped
+
+
+@lru_cache(maxsize=32)
+def _cached_matcher(items):
+    return KeywordMatcher(dict(items))
+
+
+def keyword_matcher(groups):
+    """
+    Shared `KeywordMatcher` for a `{name: [keywords]}` table.
+    """
+    return _cached_matcher(tuple((name, tuple(kws)) for name, kws in groups.items()))
@@ -1,47 +1,106 @@
-import re
+from invoice_ocr.document.block import normalize_for_match
+from invoice_ocr.document.block_index import BlockIndex
+
+# Length of the substrings posted in `_TextIndex`; shorter values are checked
+# against every distinct block text.
+_GRAM = 3
 
 
 def _normalize_text(value):
-    if value is None:
-        return ""
-    text = re.sub(r"\s+", " ", str(value).strip()).lower()
-    text = text.replace(",", "").replace("$", "")
-    return text
+    return normalize_for_match(value)
 
 
-def _best_block_confidence_for_value(value, blocks):
-    target = _normalize_text(value)
-    if not target:
-        return None
+def _grams(text):
+    return {text[i:i + _GRAM] for i in range(len(text) - _GRAM + 1)}
 
-    best = None
-    for b in blocks:
-        text = _normalize_text(b.get("text"))
-        if not text:
-            continue
 
-        if target == text or target in text or text in target:
+class _TextIndex:
+    """
+    Normalized block texts of one document, for value -> block matching.
+
+    A value matches a block when either normalized text contains the other.
+    Blocks with the same text are merged, keeping their best confidence.
+    "Block contains value" candidates come from intersecting the trigram
+    postings of the value; "value contains block" is an exact lookup of the
+    value's substrings, only at lengths some block text actually has.
+    Results are memoized per normalized value.
+    """
+
+    def __init__(self, blocks):
+        self.best = {}
+        for b in blocks:
+            text = b.match_text
             conf = b.get("confidence")
-            if conf is None:
+            if not text or conf is None:
                 continue
+            if text not in self.best or conf > self.best[text]:
+                self.best[text] = conf
+
+        self.lengths = sorted({len(text) for text in self.best})
+        self.postings = {}
+        for text in self.best:
+            for gram in _grams(text):
+                self.postings.setdefault(gram, set()).add(text)
+        self._memo = {}
+
+    def _containing(self, target):
+        if len(target) < _GRAM:
+            return [text for text in self.best if target in text]
+        grams = sorted(_grams(target), key=lambda g: len(self.postings.get(g, ())))
+        candidates = set(self.postings.get(grams[0], ()))
+        for gram in grams[1:]:
+            if not candidates:
+                break
+            candidates &= self.postings[gram]
+        return [text for text in candidates if target in text]
+
+    def _contained(self, target):
+        found = []
+        for length in self.lengths:
+            if length > len(target):
+                break
+            for i in range(len(target) - length + 1):
+                text = target[i:i + length]
+                if text in self.best:
+                    found.append(text)
+        return found
+
+    def best_confidence(self, target):
+        if target in self._memo:
+            return self._memo[target]
+
+        best = None
+        for text in self._containing(target) + self._contained(target):
+            conf = self.best[text]
             if best is None or conf > best:
                 best = conf
 
-    return round(best, 3) if best is not None else None
+        best = round(best, 3) if best is not None else None
+        self._memo[target] = best
+        return best
+
+
+def _best_block_confidence_for_value(value, text_index):
+    target = _normalize_text(value)
+    if not target:
+        return None
+    return text_index.best_confidence(target)
 
 
-def _confidence_for_structure(value, blocks):
+def _confidence_for_structure(value, text_index):
     if isinstance(value, dict):
         out = {}
         for k, v in value.items():
-            out[k] = _confidence_for_structure(v, blocks)
+            out[k] = _confidence_for_structure(v, text_index)
         return out
 
     if isinstance(value, list):
-        return [_confidence_for_structure(v, blocks) for v in value]
+        return [_confidence_for_structure(v, text_index) for v in value]
 
-    return _best_block_confidence_for_value(value, blocks)
+    return _best_block_confidence_for_value(value, text_index)
 
 
-def extract_confidence_map(data, blocks):
-    return _confidence_for_structure(data, blocks)
+def extract_confidence_map(data, blocks, index=None):
+    if index is None:
+        index = BlockIndex(blocks)
+    return _confidence_for_structure(data, _TextIndex(index.blocks))
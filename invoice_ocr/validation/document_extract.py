@@ -1,6 +1,6 @@
 import re
 
-from invoice_ocr.table.geometry import center_x, center_y
+from invoice_ocr.document.block_index import BlockIndex
 
 
 _PHONE_RE = re.compile(r"\(\d{3}\)\s*\d{3}-\d{4}")
@@ -10,10 +10,8 @@ _CITY_STATE_POSTAL_RE = re.compile(r"^\s*(.*?),\s*([A-Za-z][A-Za-z\s]+),\s*(\d{4
 _REMINDER_RE = re.compile(r"^\s*\d+\.\s*(.+)")
 
 
-def _sorted_page_blocks(blocks, page):
-    page_blocks = [b for b in blocks if b.get("page") == page and b.get("text", "").strip()]
-    page_blocks.sort(key=lambda b: (center_y(b["bbox"]), center_x(b["bbox"])))
-    return page_blocks
+def _sorted_page_blocks(index, page):
+    return [b for b in index.page_blocks(page) if b.get("text", "").strip()]
 
 
 def _get_contact_value(blocks, regex):
@@ -24,19 +22,19 @@ def _get_contact_value(blocks, regex):
     return None
 
 
-def _extract_vendor(blocks):
-    page1 = _sorted_page_blocks(blocks, 1)
+def _extract_vendor(index):
+    blocks = index.blocks
+    page1 = _sorted_page_blocks(index, 1)
     from_label = next((b for b in page1 if b["text"].strip().lower() == "from:"), None)
     to_label = next((b for b in page1 if b["text"].strip().lower() == "to:"), None)
 
     if from_label is not None:
-        fy = center_y(from_label["bbox"])
-        stop_y = center_y(to_label["bbox"]) if to_label is not None else fy + 500
+        fy = from_label.cy
+        stop_y = to_label.cy if to_label is not None else fy + 500
         left = [
             b for b in page1
-            if center_x(b["bbox"]) < 1200 and fy < center_y(b["bbox"]) < stop_y
+            if b.cx < 1200 and fy < b.cy < stop_y
         ]
-        left.sort(key=lambda b: (center_y(b["bbox"]), center_x(b["bbox"])))
 
         lines = [b["text"].strip() for b in left if b["text"].strip()]
         name = lines[0] if lines else None
@@ -67,7 +65,7 @@ def _extract_vendor(blocks):
         if inv_vendor:
             return inv_vendor
 
-    top = [b for b in page1 if center_y(b["bbox"]) < 360]
+    top = [b for b in page1 if b.cy < 360]
     name = None
     for b in top:
         text = b["text"].strip()
@@ -79,14 +77,14 @@ def _extract_vendor(blocks):
     if name:
         name_block = next((b for b in top if b["text"].strip() == name), None)
         if name_block is not None:
-            nx = center_x(name_block["bbox"])
-            ny = center_y(name_block["bbox"])
+            nx = name_block.cx
+            ny = name_block.cy
             for b in top:
                 text = b["text"].strip()
                 if not text or b is name_block:
                     continue
-                by = center_y(b["bbox"])
-                bx = center_x(b["bbox"])
+                by = b.cy
+                bx = b.cx
                 if by > ny and abs(bx - nx) < 220:
                     if _PHONE_RE.search(text) or _EMAIL_RE.search(text) or "website" in text.lower():
                         continue
@@ -121,22 +119,22 @@ def _extract_vendor(blocks):
     return {k: v for k, v in vendor.items() if v}
 
 
-def _extract_customer_address_full(blocks, fields):
+def _extract_customer_address_full(index, fields):
     street = fields.get("address")
     line2 = None
 
     if street:
-        for b in _sorted_page_blocks(blocks, 1):
+        for b in index.page_blocks(1):
             text = b["text"].strip()
-            if street.lower() == text.lower():
-                sy = center_y(b["bbox"])
-                sx = center_x(b["bbox"])
-                for c in _sorted_page_blocks(blocks, 1):
+            if text and street.lower() == text.lower():
+                sy = b.cy
+                sx = b.cx
+                for c in index.below(1, sy, 100):
                     t = c["text"].strip()
                     if not t:
                         continue
-                    cy = center_y(c["bbox"])
-                    cx = center_x(c["bbox"])
+                    cy = c.cy
+                    cx = c.cx
                     if 0 < (cy - sy) <= 100 and abs(cx - sx) <= 300:
                         if "period statement" in t.lower() or "date" in t.lower():
                             continue
@@ -162,8 +160,8 @@ def _extract_customer_address_full(blocks, fields):
     return {k: v for k, v in parsed.items() if v}
 
 
-def _extract_sections(blocks):
-    low = " ".join([b.get("text", "").lower() for b in blocks])
+def _extract_sections(corpus):
+    low = corpus.raw_lower
     return {
         "meter_information": "meter information" in low,
         "bill_summary": "bill summary" in low,
@@ -171,8 +169,8 @@ def _extract_sections(blocks):
     }
 
 
-def _extract_reminders_and_notes(blocks):
-    page2 = _sorted_page_blocks(blocks, 2)
+def _extract_reminders_and_notes(index):
+    page2 = _sorted_page_blocks(index, 2)
     reminders = []
     notes = []
 
@@ -215,20 +213,23 @@ def _extract_reminders_and_notes(blocks):
     }
 
 
-def extract_document_enrichment(blocks, fields):
+def extract_document_enrichment(blocks, fields, index=None):
     extra = {}
+    if index is None:
+        index = BlockIndex(blocks)
+    blocks = index.blocks
 
-    vendor = _extract_vendor(blocks)
+    vendor = _extract_vendor(index)
     if vendor:
         extra["vendor"] = vendor
 
-    customer_full = _extract_customer_address_full(blocks, fields)
+    customer_full = _extract_customer_address_full(index, fields)
     if customer_full:
         extra["customer_address_full"] = customer_full
 
-    extra["sections"] = _extract_sections(blocks)
+    extra["sections"] = _extract_sections(index.corpus)
 
-    rn = _extract_reminders_and_notes(blocks)
+    rn = _extract_reminders_and_notes(index)
     if rn["reminders"]:
         extra["reminders"] = rn["reminders"]
     if rn["notes"]:
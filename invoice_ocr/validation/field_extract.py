@@ -1,4 +1,5 @@
-from invoice_ocr.table.geometry import center_x, center_y
+from invoice_ocr.document.block_index import BlockIndex
+from invoice_ocr.utils.keywords import keyword_matcher
 import re
 
 
@@ -29,17 +30,13 @@ FIELD_PATTERNS = {
 }
 
 
-def _all_keywords(field_labels):
-    return [kw for labels in field_labels.values() for kw in labels]
-
-
-def _is_valid_candidate(field_key, text, keywords):
+def _is_valid_candidate(field_key, text, label_matcher):
     t = text.strip()
     if not t:
         return False
 
     lower = t.lower()
-    if any(k in lower for k in keywords):
+    if label_matcher.search(lower):
         return False
 
     pattern = FIELD_PATTERNS.get(field_key)
@@ -50,25 +47,22 @@ def _is_valid_candidate(field_key, text, keywords):
 
 
 def _extract_value_for_label(
-    blocks, label_block, field_key, all_label_keywords, y_tol=20, x_tol=300, y_down=120
+    index, label_block, field_key, label_matcher, y_tol=20, x_tol=300, y_down=120
 ):
-    ly = center_y(label_block["bbox"])
-    lx = center_x(label_block["bbox"])
+    ly = label_block.cy
+    lx = label_block.cx
     page = label_block.get("page")
 
     candidates = []
 
-    for b in blocks:
+    for b in index.band(ly - y_tol, ly + max(y_tol, y_down), page=page):
         if b is label_block:
             continue
 
-        if page is not None and b.get("page") != page:
-            continue
-
-        by = center_y(b["bbox"])
-        bx = center_x(b["bbox"])
+        by = b.cy
+        bx = b.cx
         text = b["text"].strip()
-        if not _is_valid_candidate(field_key, text, all_label_keywords):
+        if not _is_valid_candidate(field_key, text, label_matcher):
             continue
 
         # Prefer value on same line, to the right of the label.
@@ -89,18 +83,16 @@ def _extract_value_for_label(
     return None
 
 
-def extract_document_fields(blocks, field_labels=FIELD_LABELS):
+def extract_document_fields(blocks, field_labels=FIELD_LABELS, index=None):
     fields = {}
-    label_keywords = _all_keywords(field_labels)
-
-    for field_key, keywords in field_labels.items():
-        labels = [
-            b for b in blocks
-            if any(k in b["text"].lower() for k in keywords)
-        ]
-
-        for label in labels:
-            value = _extract_value_for_label(blocks, label, field_key, label_keywords)
+    matcher = keyword_matcher(field_labels)
+    if index is None:
+        index = BlockIndex(blocks)
+    labels_by_field = matcher.group_blocks(index.blocks, text=lambda b: b.text_lower)
+
+    for field_key in field_labels:
+        for label in labels_by_field[field_key]:
+            value = _extract_value_for_label(index, label, field_key, matcher)
             if value:
                 fields[field_key] = value
                 break
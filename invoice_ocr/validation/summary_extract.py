@@ -1,25 +1,26 @@
+from invoice_ocr.document.block_index import BlockIndex
 from invoice_ocr.validation.normalize import to_decimal
 from invoice_ocr.validation.summary_labels import SUMMARY_LABELS
-from invoice_ocr.table.geometry import center_x, center_y
+from invoice_ocr.utils.keywords import keyword_matcher
 
-def extract_summary(blocks, x_gap=300, y_tol=20):
+def extract_summary(blocks, x_gap=300, y_tol=20, index=None):
     summary = {}
+    if index is None:
+        index = BlockIndex(blocks)
+    labels_by_key = keyword_matcher(SUMMARY_LABELS).group_blocks(
+        index.blocks, text=lambda b: b.text_lower
+    )
 
-    for label_key, keywords in SUMMARY_LABELS.items():
-        label_blocks = [
-            b for b in blocks
-            if any(k in b["text"].lower() for k in keywords)
-        ]
-
-        for label in label_blocks:
-            ly = center_y(label["bbox"])
-            lx = center_x(label["bbox"])
+    for label_key in SUMMARY_LABELS:
+        for label in labels_by_key[label_key]:
+            ly = label.cy
+            lx = label.cx
 
             # find value block to the RIGHT
             candidates = []
-            for b in blocks:
-                by = center_y(b["bbox"])
-                bx = center_x(b["bbox"])
+            for b in index.band(ly - y_tol, ly + y_tol):
+                by = b.cy
+                bx = b.cx
 
                 if abs(by - ly) <= y_tol and bx > lx:
                     val = to_decimal(b["text"])
@@ -1,3 +1,4 @@
+from invoice_ocr.document.block_index import BlockIndex
 from invoice_ocr.validation.line_items import validate_utility_row
 from invoice_ocr.validation.normalize import to_decimal
 from invoice_ocr.validation.confidence import extract_confidence_map
@@ -6,9 +7,14 @@ from invoice_ocr.validation.field_extract import extract_document_fields
 from invoice_ocr.validation.summary_extract import extract_summary
 from invoice_ocr.validation.summary_validate import validate_summary
 
-def validate_document(schema, rows, ocr_blocks):
-    line_reports = []
+def validate_line_items(schema, rows):
+    """
+    Checks table rows in place, returning one report per utility row.
 
+    Sets `_amount_decimal` on every row and, when a utility row's cost was
+    inferred, `_ocr_cost_per_kwh` / `_cost_per_kwh_inferred`.
+    """
+    line_reports = []
     for row in rows:
         row["_amount_decimal"] = to_decimal(row.get("Amount ($)"))
         if schema == "utility_bill":
@@ -17,19 +23,18 @@ def validate_document(schema, rows, ocr_blocks):
                 row["_ocr_cost_per_kwh"] = row.get("Cost (per kWh)")
                 row["_cost_per_kwh_inferred"] = report["inferred_cost"]
             line_reports.append(report)
+    return line_reports
+
 
-    summary = extract_summary(ocr_blocks)
-    fields = extract_document_fields(ocr_blocks)
-    enrichment = extract_document_enrichment(ocr_blocks, fields)
-    confidence_source = {
+def confidence_source(fields, enrichment, summary):
+    return {
         "fields": fields,
         **enrichment,
         "summary": summary,
     }
-    field_confidence = extract_confidence_map(confidence_source, ocr_blocks)
-    summary_report = validate_summary(schema, rows, summary)
 
 
+def validation_report(line_reports, fields, enrichment, summary, field_confidence, summary_report):
     return {
         "line_items": line_reports,
         "fields": fields,
@@ -38,3 +43,28 @@ def validate_document(schema, rows, ocr_blocks):
         "field_confidence": field_confidence,
         "summary_checks": summary_report
     }
+
+
+def validate_document(schema, rows, ocr_blocks, index=None):
+    """
+    Validation report for already-extracted table rows, in one call.
+
+    The pipeline builds the same report from the `invoice_ocr.stages`
+    graph, which also skips field confidence when it is not requested.
+    """
+    if index is None:
+        index = BlockIndex(ocr_blocks)
+    ocr_blocks = index.blocks
+
+    line_reports = validate_line_items(schema, rows)
+    summary = extract_summary(ocr_blocks, index=index)
+    fields = extract_document_fields(ocr_blocks, index=index)
+    enrichment = extract_document_enrichment(ocr_blocks, fields, index=index)
+    field_confidence = extract_confidence_map(
+        confidence_source(fields, enrichment, summary), ocr_blocks, index=index
+    )
+    summary_report = validate_summary(schema, rows, summary)
+
+    return validation_report(
+        line_reports, fields, enrichment, summary, field_confidence, summary_report
+    )
@@ -0,0 +1,76 @@
+import json
+from pathlib import Path
+
+from invoice_ocr.cli import _done_inputs, expand_inputs, output_files
+
+
+def _touch(path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"%PDF-1.4\n")
+    return path
+
+
+def test_directory_scan_keeps_pdfs_relative_to_root(tmp_path):
+    a = _touch(tmp_path / "in" / "a" / "inv.pdf")
+    b = _touch(tmp_path / "in" / "b" / "INV.PDF")
+    _touch(tmp_path / "in" / "a" / "notes.txt")
+
+    entries = expand_inputs([str(tmp_path / "in")])
+
+    assert entries == [(a, Path("a/inv.pdf")), (b, Path("b/INV.PDF"))]
+
+
+def test_glob_keeps_only_pdf_files(tmp_path):
+    pdf = _touch(tmp_path / "in" / "a" / "inv.pdf")
+    _touch(tmp_path / "in" / "a" / "notes.txt")
+    (tmp_path / "in" / "a" / "sub.pdf").mkdir()
+
+    assert expand_inputs([str(tmp_path / "in" / "a" / "*")]) == [(pdf, Path("inv.pdf"))]
+    assert expand_inputs([str(tmp_path / "in" / "**")]) == [(pdf, Path("a/inv.pdf"))]
+
+
+def test_inputs_are_deduplicated_in_order(tmp_path):
+    a = _touch(tmp_path / "a.pdf")
+    b = _touch(tmp_path / "b.pdf")
+    listing = tmp_path / "list.txt"
+    listing.write_text(f"{a}\n\n{b}\n", encoding="utf-8")
+
+    entries = expand_inputs([str(b), str(tmp_path / "*.pdf")], list_file=listing)
+
+    assert [path for path, _ in entries] == [b, a]
+    # Plain file arguments keep their name even without a PDF suffix.
+    other = _touch(tmp_path / "scan.bin")
+    assert expand_inputs([str(other)]) == [(other, Path("scan.bin"))]
+
+
+def test_output_files_mirror_and_disambiguate(tmp_path):
+    x = _touch(tmp_path / "x" / "a" / "inv.pdf")
+    y = _touch(tmp_path / "y" / "a" / "inv.pdf")
+    z = _touch(tmp_path / "x" / "b" / "inv.pdf")
+    entries = expand_inputs([str(tmp_path / "x"), str(tmp_path / "y")])
+
+    files = output_files(entries, tmp_path / "out")
+
+    assert files[z] == tmp_path / "out" / "b" / "inv.json"
+    assert files[x] != files[y]
+    for path in (x, y):
+        assert files[path].parent == tmp_path / "out" / "a"
+        assert files[path].name.startswith("inv-") and files[path].suffix == ".json"
+    # Names depend only on the input path, so --resume finds them again.
+    assert output_files(entries, tmp_path / "out") == files
+
+
+def test_done_inputs_counts_successful_records(tmp_path):
+    jsonl = tmp_path / "results.jsonl"
+    jsonl.write_text(
+        "\n".join([
+            json.dumps({"input": "a.pdf", "meta": {}}),
+            json.dumps({"input": "b.pdf", "error": {"type": "X", "message": ""}}),
+            '{"input": "c.pdf", "trunc',
+            json.dumps({"meta": {}}),
+        ]) + "\n",
+        encoding="utf-8",
+    )
+
+    assert _done_inputs(jsonl) == {"a.pdf"}
+    assert _done_inputs(tmp_path / "missing.jsonl") == set()
@@ -0,0 +1,78 @@
+import random
+
+from invoice_ocr.document.block import normalize_for_match
+from invoice_ocr.validation.confidence import extract_confidence_map
+
+
+def _linear_best(value, blocks):
+    # The per-value scan over every block that `_TextIndex` replaces.
+    target = normalize_for_match(value)
+    if not target:
+        return None
+    best = None
+    for b in blocks:
+        text = normalize_for_match(b.get("text"))
+        conf = b.get("confidence")
+        if not text or conf is None:
+            continue
+        if target == text or target in text or text in target:
+            if best is None or conf > best:
+                best = conf
+    return round(best, 3) if best is not None else None
+
+
+def _linear_map(data, blocks):
+    if isinstance(data, dict):
+        return {k: _linear_map(v, blocks) for k, v in data.items()}
+    if isinstance(data, list):
+        return [_linear_map(v, blocks) for v in data]
+    return _linear_best(data, blocks)
+
+
+def _block(text, confidence, y=0):
+    return {
+        "text": text,
+        "confidence": confidence,
+        "bbox": [[0, y], [50, y], [50, y + 10], [0, y + 10]],
+        "page": 1,
+    }
+
+
+BLOCKS = [
+    _block("Total Due", 0.91, 0),
+    _block("$1,234.50", 0.87, 20),
+    _block("  1234.50 ", 0.95, 40),
+    _block("Invoice  No:   INV-77", 0.8, 60),
+    _block("GST", 0.7, 80),
+    _block("10", 0.66, 100),
+    _block("a", 0.5, 120),
+    _block("", 0.99, 140),
+    _block("unscored", None, 160),
+    _block("$", 0.93, 180),
+]
+
+
+def test_matches_linear_scan():
+    data = {
+        "total": "1,234.50",
+        "total_money": "$1234.50",
+        "invoice": "INV-77",
+        "invoice_spaced": "invoice no: inv-77 extra",
+        "tax": ["GST", "gst 10%", 10, "10"],
+        "short": ["a", "1", "zz", "T"],
+        "empty": ["", "   ", "$", ",", None],
+        "missing": "nothing like this",
+        "unscored": "unscored",
+    }
+    assert extract_confidence_map(data, BLOCKS) == _linear_map(data, BLOCKS)
+
+
+def test_random_values_match_linear_scan():
+    rng = random.Random(7)
+    alphabet = "ab1$, "
+    blocks = [
+        _block("".join(rng.choice(alphabet) for _ in range(rng.randint(0, 8))), rng.random(), i)
+        for i in range(60)
+    ]
+    values = ["".join(rng.choice(alphabet) for _ in range(rng.randint(0, 10))) for _ in range(400)]
+    assert extract_confidence_map(values, blocks) == _linear_map(values, blocks)
@@ -0,0 +1,68 @@
+import cv2
+import numpy as np
+import pytest
+
+from invoice_ocr.preprocess.deskew import (
+    _estimate_angle_projection,
+    _rotate_bound,
+    correct_skew,
+    deskew_image,
+    estimate_angle_from_boxes,
+)
+
+
+def _page():
+    # Rows of word-like bars on a letter-sized page at 100 DPI.
+    img = np.full((1100, 850, 3), 255, np.uint8)
+    rng = np.random.default_rng(0)
+    for y in range(120, 1000, 40):
+        x = 80
+        while x < 700:
+            w = int(rng.integers(20, 90))
+            cv2.rectangle(img, (x, y), (min(x + w, 770), y + 14), (0, 0, 0), -1)
+            x += w + 12
+    return img
+
+
+def _residual(image):
+    return _estimate_angle_projection(image)
+
+
+@pytest.mark.parametrize("skew", [3.0, -3.0])
+@pytest.mark.parametrize("method", ["min_area_rect", "projection"])
+def test_deskew_removes_skew(skew, method):
+    skewed = _rotate_bound(_page(), skew)
+    assert abs(_residual(skewed) - skew) < 0.2
+
+    corrected, meta = deskew_image(skewed, method=method)
+
+    assert meta["applied"]
+    assert abs(meta["detected_angle_deg"] - skew) < 0.2
+    # Rotating by the detected angle instead of its inverse doubles the skew.
+    assert abs(_residual(corrected)) < 0.2
+
+
+@pytest.mark.parametrize("skew", [3.0, -3.0])
+def test_detector_boxes_remove_skew(skew):
+    skewed = _rotate_bound(_page(), skew)
+    h, w = skewed.shape[:2]
+    matrix = cv2.getRotationMatrix2D((w / 2.0, h / 2.0), skew, 1.0)
+    quads = []
+    for y in range(200, 900, 40):
+        corners = np.array([[[100, y], [600, y], [600, y + 14], [100, y + 14]]], np.float32)
+        quads.append(cv2.transform(corners, matrix)[0].tolist())
+
+    angle = estimate_angle_from_boxes(quads)
+    assert abs(angle - skew) < 0.05
+
+    corrected, meta = correct_skew(skewed, angle, "detector")
+    assert meta["applied"]
+    assert abs(_residual(corrected)) < 0.2
+
+
+def test_small_angles_are_left_alone():
+    page = _page()
+    corrected, meta = correct_skew(page, 0.5, "projection")
+
+    assert corrected is page
+    assert not meta["applied"]
@@ -0,0 +1,85 @@
+import os
+
+from invoice_ocr.utils.disk_cache import DiskCache, open_cache
+
+
+def _age(cache, key, mtime):
+    os.utime(cache._path(key), (mtime, mtime))
+
+
+def test_put_get_roundtrip(tmp_path):
+    cache = DiskCache(tmp_path)
+    cache.put("ab12", {"blocks": [1, 2, 3]})
+
+    assert cache.get("ab12") == {"blocks": [1, 2, 3]}
+    assert cache.get("cd34") is None
+    assert cache.stats() == {"hits": 1, "misses": 1}
+
+
+def test_total_is_tracked_and_restored_on_open(tmp_path):
+    cache = DiskCache(tmp_path)
+    cache.put("aa01", b"x" * 1000)
+    cache.put("bb01", b"y" * 1000)
+    on_disk = sum(p.stat().st_size for p in tmp_path.glob("*/*.pkl"))
+    assert cache.total_bytes == on_disk
+
+    # Overwriting replaces the entry's size instead of adding to it.
+    cache.put("aa01", b"z" * 10)
+    on_disk = sum(p.stat().st_size for p in tmp_path.glob("*/*.pkl"))
+    assert cache.total_bytes == on_disk
+    assert DiskCache(tmp_path).total_bytes == on_disk
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = DiskCache(tmp_path, max_bytes=2500)
+    cache.put("aa01", b"a" * 1000)
+    cache.put("bb01", b"b" * 1000)
+    _age(cache, "aa01", 1_000_000)
+    _age(cache, "bb01", 2_000_000)
+
+    # Reading "aa01" makes "bb01" the oldest entry.
+    assert cache.get("aa01") is not None
+    cache.put("cc01", b"c" * 1000)
+
+    assert cache.get("bb01") is None
+    assert cache.get("aa01") == b"a" * 1000
+    assert cache.get("cc01") == b"c" * 1000
+    assert cache.total_bytes <= cache.max_bytes
+
+
+def test_put_below_budget_does_not_scan(tmp_path, monkeypatch):
+    cache = DiskCache(tmp_path)
+    # The first write measures the directory; later ones only track it.
+    cache.put("first", 0)
+
+    def no_scan():
+        raise AssertionError("directory scanned below budget")
+
+    monkeypatch.setattr(cache, "_entries", no_scan)
+    for i in range(50):
+        cache.put(f"{i:04d}", i)
+    assert cache.get("0049") == 49
+
+
+def test_open_and_get_do_not_scan(tmp_path, monkeypatch):
+    DiskCache(tmp_path).put("aa01", b"x" * 100)
+
+    def no_scan(self):
+        raise AssertionError("directory scanned")
+
+    monkeypatch.setattr(DiskCache, "_entries", no_scan)
+    cache = DiskCache(tmp_path)
+    assert cache.get("aa01") == b"x" * 100
+    assert cache.get("bb01") is None
+
+
+def test_open_cache_shares_one_instance(tmp_path):
+    cache = open_cache(tmp_path / "c", max_bytes=1000)
+    cache.put("aa01", 1)
+    cache.get("aa01")
+
+    again = open_cache(str(tmp_path / "c"), max_bytes=1000)
+    assert again is cache
+    again.get("bb01")
+    assert again.stats() == {"hits": 1, "misses": 1}
+    assert open_cache(tmp_path / "c", max_bytes=2000) is not cache
@@ -0,0 +1,103 @@
+import random
+
+from invoice_ocr.table.header_detector import HEADER_KEYWORDS
+from invoice_ocr.utils.keywords import KeywordMatcher, keyword_matcher
+from invoice_ocr.validation.summary_labels import SUMMARY_LABELS
+
+
+def _brute_match(groups, text):
+    return {name for name, keywords in groups.items() if any(k and k in text for k in keywords)}
+
+
+def _assert_same(groups, texts):
+    matcher = KeywordMatcher(groups)
+    keywords = [k for kws in groups.values() for k in kws]
+    for text in texts:
+        assert matcher.match(text) == _brute_match(groups, text), text
+        assert matcher.search(text) == any(k and k in text for k in keywords), text
+
+
+def test_prefix_and_substring_keywords():
+    groups = {
+        "total": ["total"],
+        "subtotal": ["sub total", "subtotal"],
+        "total_due": ["total due", "total amount due"],
+        "amount": ["amount"],
+        "due": ["due"],
+        "unit": ["unit", "unit price"],
+        "price": ["price"],
+    }
+    texts = [
+        "",
+        "total",
+        "subtotal",
+        "sub total",
+        "total due",
+        "total amount due now",
+        "amount",
+        "unit price",
+        "unit",
+        "price per unit",
+        "totaltotal due",
+        "no keywords here",
+    ]
+    _assert_same(groups, texts)
+    assert KeywordMatcher(groups).match("total amount due") == {"total", "total_due", "amount", "due"}
+
+
+def test_keyword_shared_between_groups():
+    groups = {"a": ["rate", "usage"], "b": ["rate"], "c": ["separate"]}
+    _assert_same(groups, ["rate", "separate", "usage rate", "sep"])
+    assert KeywordMatcher(groups).match("separate") == {"a", "b", "c"}
+
+
+def test_empty_tables():
+    assert KeywordMatcher({}).match("total") == frozenset()
+    assert not KeywordMatcher({}).search("total")
+    assert KeywordMatcher({"a": [""]}).match("total") == frozenset()
+
+
+def test_random_texts_match_brute_force():
+    rng = random.Random(0)
+    alphabet = "abt "
+    groups = {
+        f"g{i}": ["".join(rng.choice(alphabet) for _ in range(rng.randint(1, 4))) for _ in range(3)]
+        for i in range(8)
+    }
+    texts = ["".join(rng.choice(alphabet) for _ in range(rng.randint(0, 12))) for _ in range(500)]
+    _assert_same(groups, texts)
+
+
+def test_repo_keyword_tables():
+    texts = [
+        "unit price",
+        "qty",
+        "total amount due",
+        "subtotal",
+        "gst total",
+        "amount payable",
+        "description of services",
+    ]
+    _assert_same({"header": HEADER_KEYWORDS}, texts)
+    _assert_same(SUMMARY_LABELS, texts)
+
+
+def test_group_blocks_keeps_block_order():
+    groups = {"total": ["total"], "due": ["due", "total due"]}
+    blocks = [
+        {"text": "Total Due"},
+        {"text": "Invoice"},
+        {"text": "DUE DATE"},
+        {"text": "Subtotal"},
+    ]
+    grouped = KeywordMatcher(groups).group_blocks(blocks)
+
+    assert grouped == {
+        "total": [blocks[0], blocks[3]],
+        "due": [blocks[0], blocks[2]],
+    }
+
+
+def test_keyword_matcher_is_shared():
+    groups = {"a": ["x", "y"]}
+    assert keyword_matcher(groups) is keyword_matcher({"a": ["x", "y"]})
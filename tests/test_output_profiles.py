@@ -0,0 +1,115 @@
+import pytest
+
+from invoice_ocr.api import OCRConfig
+from invoice_ocr.pipeline import _requested, run_post_ocr
+from invoice_ocr.universal_engine import OUTPUT_PROFILES, output_sections, project_output
+
+
+def _block(text, x, y):
+    return {
+        "text": text,
+        "confidence": 0.9,
+        "page": 1,
+        "bbox": [[x, y], [x + 90, y], [x + 90, y + 20], [x, y + 20]],
+    }
+
+
+def _ocr_result():
+    blocks = [
+        _block("Invoice Number", 100, 100),
+        _block("INV-1", 300, 100),
+        _block("Total Due", 100, 900),
+        _block("$12.00", 300, 900),
+    ]
+    return {"pages": [{"page": 1, "image": "page-1.png", "blocks": blocks}], "blocks": blocks}
+
+
+@pytest.mark.parametrize("settings", [
+    {"deskew_method": "hough"},
+    {"output_profile": "tiny"},
+    {"output_fields": ("normalised.totals",)},
+])
+def test_config_rejects_unknown_settings(settings):
+    with pytest.raises(ValueError):
+        OCRConfig(**settings)
+
+
+def test_config_accepts_known_settings():
+    config = OCRConfig(
+        deskew_method="detector",
+        output_profile="minimal",
+        output_fields=("normalized.totals", "risk", "meta.cache"),
+    )
+    assert config.output_profile == "minimal"
+
+
+def test_output_sections():
+    assert output_sections("minimal") == {"normalized", "risk"}
+    assert output_sections("full") == set(OUTPUT_PROFILES["full"])
+    assert output_sections("full", ["normalized.totals", "risk", "meta.cache"]) == {
+        "normalized", "risk",
+    }
+    with pytest.raises(ValueError):
+        output_sections("full", ["normalised"])
+
+
+def test_project_output_keeps_paths_and_meta():
+    out = {
+        "normalized": {"totals": {"total": "12.00", "tax": None}, "vendor": {"name": "Acme"}},
+        "risk": {"level": "low"},
+        "tables": [{"a": 1}],
+        "meta": {"engine_version": "2.0.0"},
+    }
+
+    projected = project_output(out, ["normalized.totals.total", "tables", "risk.missing", "nope"])
+
+    assert projected == {
+        "normalized": {"totals": {"total": "12.00"}},
+        "tables": [{"a": 1}],
+        "meta": {"engine_version": "2.0.0"},
+    }
+    # Values are shared, not copied; the input is left intact.
+    assert projected["tables"] is out["tables"]
+    assert out["normalized"]["totals"] == {"total": "12.00", "tax": None}
+
+
+@pytest.mark.parametrize("fields, path, expected", [
+    (None, "validation.raw", True),
+    ((), "validation.raw", True),
+    (("validation",), "validation.raw", True),
+    (("validation.raw",), "validation.raw", True),
+    (("validation.raw.lines",), "validation.raw", True),
+    (("validation.fields",), "validation.raw", False),
+    (("validation.rawest",), "validation.raw", False),
+    (("meta",), "meta.legacy_universal", True),
+    (("risk",), "meta.legacy_universal", False),
+])
+def test_requested(fields, path, expected):
+    assert _requested(fields, path) is expected
+
+
+def test_run_post_ocr_profiles():
+    minimal = run_post_ocr(_ocr_result(), output_profile="minimal")
+    assert set(minimal) == {"normalized", "risk", "meta"}
+    assert "legacy_universal" not in minimal["meta"]
+
+    full = run_post_ocr(_ocr_result())
+    assert set(full) == set(OUTPUT_PROFILES["full"]) | {"meta"}
+    assert "legacy_universal" in full["meta"]
+    assert "timings_ms" not in full["meta"]
+
+
+def test_run_post_ocr_fields_skip_unrequested_stages():
+    out = run_post_ocr(
+        _ocr_result(), output_profile="debug", fields=("normalized.totals.total",)
+    )
+
+    assert out["normalized"] == {"totals": {"total": "12.00"}}
+    assert set(out) == {"normalized", "meta"}
+    timings = out["meta"]["timings_ms"]
+    assert "universal" in timings
+    assert "risk" not in timings
+
+    out = run_post_ocr(_ocr_result(), output_profile="debug", fields=("risk",))
+    assert set(out) == {"risk", "meta"}
+    assert "universal" not in out["meta"]["timings_ms"]
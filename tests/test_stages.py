@@ -0,0 +1,105 @@
+import pytest
+
+from invoice_ocr.stages import STAGES, DocumentStages
+from invoice_ocr.validation.validator import validate_document
+
+
+def _block(text, x, y):
+    return {
+        "text": text,
+        "confidence": 0.9,
+        "page": 1,
+        "bbox": [[x, y], [x + 90, y], [x + 90, y + 20], [x, y + 20]],
+    }
+
+
+def _ocr_result():
+    blocks = [
+        _block("Invoice Number", 100, 100),
+        _block("INV-1", 300, 100),
+        _block("Total Due", 100, 900),
+        _block("$12.00", 300, 900),
+    ]
+    return {"pages": [{"page": 1, "image": "page-1.png", "blocks": blocks}], "blocks": blocks}
+
+
+def _upstream(name):
+    seen = set()
+    todo = [name]
+    while todo:
+        stage = todo.pop()
+        if stage not in seen:
+            seen.add(stage)
+            todo.extend(STAGES[stage][0])
+    return seen
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    counts = {}
+    for name, (deps, fn) in list(STAGES.items()):
+        def counted(stages, name=name, fn=fn):
+            counts[name] = counts.get(name, 0) + 1
+            return fn(stages)
+        monkeypatch.setitem(STAGES, name, (deps, counted))
+    return counts
+
+
+def test_dependencies_are_declared_and_acyclic():
+    for name, (deps, _) in STAGES.items():
+        assert set(deps) <= set(STAGES), name
+        assert not any(name in _upstream(dep) for dep in deps), name
+
+
+def test_evaluates_only_upstream_stages(calls):
+    stages = DocumentStages(_ocr_result())
+
+    stages["risk"]
+
+    assert set(calls) == _upstream("risk")
+    assert "universal" not in calls
+    assert set(stages.timings_ms) == set(calls)
+    assert "risk" in stages and "universal" not in stages
+
+
+def test_results_are_memoized(calls):
+    stages = DocumentStages(_ocr_result())
+
+    first = stages["validation"]
+    stages["universal"]
+    assert stages["validation"] is first
+    assert all(count == 1 for count in calls.values())
+
+
+def test_invalidate_reruns_only_dependents(calls):
+    stages = DocumentStages(_ocr_result())
+    stages["universal"]
+    stages["risk"]
+    index = stages["index"]
+
+    stages.invalidate("summary")
+    for name in ("summary", "confidence", "summary_checks", "validation", "risk", "universal"):
+        assert name not in stages, name
+        assert name not in stages.timings_ms, name
+    assert stages["index"] is index
+    assert "fields" in stages and "tables" in stages
+
+    calls.clear()
+    stages["risk"]
+    assert set(calls) == {"summary", "confidence", "summary_checks", "validation", "risk"}
+
+
+def test_without_confidence():
+    stages = DocumentStages(_ocr_result(), with_confidence=False)
+
+    assert stages["confidence"] == {}
+    assert stages["validation"]["field_confidence"] == {}
+    assert DocumentStages(_ocr_result())["confidence"] != {}
+
+
+def test_matches_validate_document():
+    stages = DocumentStages(_ocr_result())
+    table_out = stages["schema"]
+
+    expected = validate_document(table_out["schema"], table_out["rows"], _ocr_result()["blocks"])
+    assert stages["validation"] == expected
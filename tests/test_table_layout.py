@@ -0,0 +1,145 @@
+import random
+
+from invoice_ocr.document.block import Block
+from invoice_ocr.table.columns import ALIGN_TOLERANCE, ColumnLayout
+from invoice_ocr.table.continuation import is_row_aligned_with_columns
+from invoice_ocr.table.rows import cluster_rows, group_rows
+
+
+def _block(text, x0, x1, y=0):
+    return Block({
+        "text": text,
+        "confidence": 0.9,
+        "bbox": [[x0, y], [x1, y], [x1, y + 10], [x0, y + 10]],
+        "page": 1,
+    })
+
+
+def _linear_column_at(columns, x):
+    for col in columns:
+        if col["xmin"] <= x <= col["xmax"]:
+            return col
+    return None
+
+
+def _linear_aligned(columns, x, tolerance=ALIGN_TOLERANCE):
+    return any(c["xmin"] - tolerance <= x <= c["xmax"] + tolerance for c in columns)
+
+
+def test_column_at_first_match_with_overlaps():
+    columns = [
+        {"name": "wide", "xmin": 0, "xmax": 300},
+        {"name": "a", "xmin": 50, "xmax": 120},
+        {"name": "b", "xmin": 100, "xmax": 400},
+        {"name": "c", "xmin": 350, "xmax": 360},
+    ]
+    layout = ColumnLayout(columns)
+
+    assert layout.column_at(110)["name"] == "wide"
+    assert layout.column_at(300)["name"] == "wide"
+    assert layout.column_at(301)["name"] == "b"
+    assert layout.column_at(355)["name"] == "b"
+    assert layout.column_at(-1) is None
+    assert layout.column_at(401) is None
+
+
+def test_column_at_matches_linear_scan():
+    rng = random.Random(3)
+    for _ in range(50):
+        columns = []
+        for i in range(rng.randint(0, 8)):
+            xmin = rng.randint(0, 500)
+            columns.append({"name": str(i), "xmin": xmin, "xmax": xmin + rng.randint(0, 150)})
+        columns.sort(key=lambda c: c["xmin"])
+        layout = ColumnLayout(columns)
+        for x in range(-30, 700, 3):
+            assert layout.column_at(x) is _linear_column_at(columns, x)
+            assert layout.is_aligned(x) == _linear_aligned(columns, x)
+
+
+def test_is_aligned_band_edges():
+    columns = [{"name": "qty", "xmin": 100, "xmax": 200}]
+    layout = ColumnLayout(columns)
+
+    assert layout.is_aligned(80)
+    assert layout.is_aligned(220)
+    assert not layout.is_aligned(79.5)
+    assert not layout.is_aligned(220.5)
+    assert not layout.is_aligned(79)
+    assert not layout.is_aligned(221)
+
+
+def test_row_alignment_uses_block_centers():
+    columns = [{"name": "qty", "xmin": 100, "xmax": 200}]
+    inside = {"blocks": [_block("3", 210, 230)]}
+    outside = {"blocks": [_block("3", 212, 232)]}
+
+    assert is_row_aligned_with_columns(inside, columns)
+    assert not is_row_aligned_with_columns(outside, columns)
+    assert is_row_aligned_with_columns(outside, columns, tolerance=22)
+    assert is_row_aligned_with_columns(inside, ColumnLayout(columns))
+
+
+def test_assign_maps_blocks_to_columns():
+    layout = ColumnLayout([
+        {"name": "Description", "xmin": 0, "xmax": 300},
+        {"name": "Amount", "xmin": 310, "xmax": 400},
+    ])
+    blocks = [_block("Widget", 10, 100), _block("12.00", 320, 380), _block("?", 500, 520)]
+
+    assert layout.assign(blocks) == {"Description": "Widget", "Amount": "12.00"}
+
+
+def _row_ids(rows, order):
+    return [(row["y"], [order[id(b)] for b in row["blocks"]]) for row in rows]
+
+
+def test_cluster_rows_ignores_input_order():
+    rng = random.Random(11)
+    blocks = []
+    for i in range(80):
+        x = rng.randint(0, 800)
+        y = rng.choice([0, 4, 9, 14, 30, 33, 60, 100]) + rng.random()
+        blocks.append(_block(str(i), x, x + 20, y=y))
+    position = {id(b): i for i, b in enumerate(blocks)}
+    expected = [
+        (y, sorted(ids)) for y, ids in _row_ids(cluster_rows(blocks), position)
+    ]
+
+    for _ in range(20):
+        shuffled = blocks[:]
+        rng.shuffle(shuffled)
+        rows = cluster_rows(shuffled)
+        # Same rows and anchors; within a row, blocks keep their input order.
+        assert [(y, sorted(ids)) for y, ids in _row_ids(rows, position)] == expected
+        order = {id(b): i for i, b in enumerate(shuffled)}
+        for row in rows:
+            assert [order[id(b)] for b in row["blocks"]] == sorted(order[id(b)] for b in row["blocks"])
+
+
+def test_cluster_rows_anchor_tolerance():
+    blocks = [_block("a", 0, 10, y=0), _block("b", 20, 30, y=15), _block("c", 40, 50, y=16)]
+    rows = cluster_rows(blocks)
+
+    assert [[b["text"] for b in row["blocks"]] for row in rows] == [["a", "b"], ["c"]]
+    assert [row["y"] for row in rows] == [5, 21]
+
+
+def test_group_rows_skips_header_line():
+    blocks = [_block("Qty", 0, 10, y=0), _block("2", 0, 10, y=30), _block("4", 20, 30, y=32)]
+    rows = group_rows(blocks, header_y=5)
+
+    assert [[b["text"] for b in row["blocks"]] for row in rows] == [["2", "4"]]
+
+
+def test_helpers_accept_plain_block_dicts():
+    plain = [dict(_block("Widget", 10, 100, y=30)), dict(_block("12.00", 320, 380, y=32))]
+    columns = [
+        {"name": "Description", "xmin": 0, "xmax": 300},
+        {"name": "Amount", "xmin": 310, "xmax": 400},
+    ]
+
+    rows = group_rows(plain, header_y=0)
+    assert [[b["text"] for b in row["blocks"]] for row in rows] == [["Widget", "12.00"]]
+    assert ColumnLayout(columns).assign(plain) == {"Description": "Widget", "Amount": "12.00"}
+    assert is_row_aligned_with_columns({"blocks": plain}, columns)
@@ -0,0 +1,71 @@
+from invoice_ocr.ocr.text_layer import _parse_bbox_layout, is_usable_text
+
+
+def _word(text, x0, y0, x1, y1):
+    return f'<word xMin="{x0}" yMin="{y0}" xMax="{x1}" yMax="{y1}">{text}</word>'
+
+
+def _layout(*pages):
+    body = "".join(
+        '<page width="612" height="792"><flow><block>'
+        + "".join(f"<line>{''.join(line)}</line>" for line in lines)
+        + "</block></flow></page>"
+        for lines in pages
+    )
+    return (
+        '<html xmlns="http://www.w3.org/1999/xhtml"><head></head>'
+        f"<body><doc>{body}</doc></body></html>"
+    )
+
+
+def test_parse_splits_phrases_and_scales_to_pixels():
+    xml = _layout([
+        [
+            _word("Invoice", 72, 72, 108, 82),
+            _word("Number", 111, 72, 150, 82),
+            # Gap of 150 pt, far more than one line height: a new block.
+            _word("INV-1", 300, 72, 330, 82),
+        ],
+    ])
+
+    (blocks,) = _parse_bbox_layout(xml, dpi=144)
+
+    assert [b["text"] for b in blocks] == ["Invoice Number", "INV-1"]
+    assert blocks[0]["bbox"] == [[144.0, 144.0], [300.0, 144.0], [300.0, 164.0], [144.0, 164.0]]
+    assert all(b["page"] == 1 and b["confidence"] == 1.0 for b in blocks)
+
+
+def test_parse_orders_blocks_and_numbers_pages():
+    xml = _layout(
+        [
+            [_word("Total", 72, 300, 100, 310), _word("9.00", 400, 300, 430, 310)],
+            # Drawn later but higher up the page; "Jan" sits 2 pt above
+            # "Date" and is still read after it, left to right.
+            [_word("Date", 72, 100, 100, 110), _word("Jan", 402, 98, 420, 108)],
+            [_word("", 72, 200, 100, 210)],
+        ],
+        [],
+    )
+
+    first, second = _parse_bbox_layout(xml, dpi=72)
+
+    assert [b["text"] for b in first] == ["Date", "Jan", "Total", "9.00"]
+    assert second == []
+
+
+def test_parse_sorts_words_within_a_line():
+    xml = _layout([[_word("World", 110, 72, 140, 82), _word("Hello", 72, 72, 105, 82)]])
+
+    (blocks,) = _parse_bbox_layout(xml, dpi=72)
+
+    assert [b["text"] for b in blocks] == ["Hello World"]
+
+
+def test_usable_text():
+    good = "Invoice INV-1001 dated 2024-01-05, total due $1,234.50"
+    assert is_usable_text(good)
+    assert not is_usable_text("")
+    assert not is_usable_text("Page 1 of 2")
+    assert not is_usable_text(good + " (cid:12)(cid:34)")
+    assert not is_usable_text(good + "�" * 10)
+    assert not is_usable_text(good + "\x01" * 10)